@@ -5,10 +5,6 @@
 import logging
 import os
 import threading
-import pickle
-
-from PIL import Image, ImageFont
-from cairosvg import svg2png
 
 from cockpitdecks import (
     # Constants, keywords
@@ -38,6 +34,10 @@ from cockpitdecks import (
     yaml,
 )
 from cockpitdecks.resources.color import has_ext
+from cockpitdecks.resources.fontcache import FONTS
+from cockpitdecks.resources.registry import ResourceRegistry, load_image, load_bytes
+from cockpitdecks.resources.iconcache import IconCache
+from cockpitdecks.resources.startupprofile import STARTUP_PROFILE
 from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
 
 from cockpitdecks.observable import Observables
@@ -88,8 +88,9 @@ class Aircraft:
 
         # Content
         self._fonts = {}
-        self._sounds = {}
-        self._icons = {}
+        self._sounds = ResourceRegistry(loader=load_bytes)
+        self._icons = ResourceRegistry(loader=load_image)
+        self._icon_cache: IconCache | None = None
         self._observables: Observables | None = None
 
         # Internal variables
@@ -274,9 +275,12 @@ class Aircraft:
     def load_resources(self):
         # currently, nothing is not with this config, but it is loaded if it exists
         self.load_livery_config()
-        self.load_fonts()
-        self.load_icons()
-        self.load_sounds()
+        with STARTUP_PROFILE.phase("Aircraft.load_fonts"):
+            self.load_fonts()
+        with STARTUP_PROFILE.phase("Aircraft.load_icons"):
+            self.load_icons()
+        with STARTUP_PROFILE.phase("Aircraft.load_sounds"):
+            self.load_sounds()
         self.load_observables()
         self.cockpit.add_resources(aircraft=self)
 
@@ -320,39 +324,30 @@ class Aircraft:
 
     def load_icons(self):
         # Loading aircraft icons
+        # Icons are indexed by name, they are loaded on first use.
         #
         cache_icon = self.get_attribute("cache-icon")
         dn = os.path.join(self.acpath, CONFIG_FOLDER, RESOURCES_FOLDER, ICONS_FOLDER)
         if os.path.exists(dn):
-            cache = os.path.join(dn, "_icon_cache.pickle")
-            if os.path.exists(cache) and cache_icon:
-                with open(cache, "rb") as fp:
-                    self._icons = pickle.load(fp)
-                logger.info(f"{len(self._icons)} aircraft icons loaded from cache")
-            else:
-                icons = os.listdir(dn)
-                for i in icons:
-                    fn = os.path.join(dn, i)
-                    if has_ext(i, "png"):  # later, might load JPG as well.
-                        image = Image.open(fn)
-                        self._icons[i] = image
-                    elif has_ext(i, "svg"):  # Wow.
-                        try:
-                            fn = os.path.join(dn, i)
-                            fout = fn.replace(".svg", ".png")
-                            svg2png(url=fn, write_to=fout)
-                            image = Image.open(fout)
-                            self._icons[i] = image
-                        except:
-                            logger.warning(f"could not load icon {fn}")
-                            pass  # no cairosvg
-
-                if cache_icon:  # we cache both folders of icons
-                    with open(cache, "wb") as fp:
-                        pickle.dump(self._icons, fp)
-                    logger.info(f"{len(self._icons)} aircraft icons cached")
-                else:
-                    logger.info(f"{len(self._icons)} aircraft icons loaded")
+            loader = None
+            if cache_icon:  # decoded icons are kept in a cache file, only changed icons are decoded again
+                self._icon_cache = IconCache(dn)
+                loader = self._icon_cache.get
+            icons = os.listdir(dn)
+            for i in icons:
+                fn = os.path.join(dn, i)
+                if has_ext(i, "png"):  # later, might load JPG as well.
+                    self._icons.register(i, fn, loader=loader)
+                elif has_ext(i, "svg"):  # converted to PNG in memory on first use
+                    self._icons.register(i, fn, loader=loader)
+                    png = i.replace(".svg", ".png")
+                    if png not in icons:
+                        self._icons.register(png, fn, loader=loader)
+            logger.info(f"{len(self._icons)} aircraft icons indexed{', cached' if cache_icon else ''}")
+
+    def save_icon_cache(self):
+        if self._icon_cache is not None:
+            self._icon_cache.save()
 
     def load_fonts(self):
         # Loading fonts.
@@ -369,10 +364,9 @@ class Aircraft:
                 if has_ext(i, ".ttf") or has_ext(i, ".otf"):
                     if i not in self._fonts.keys():
                         fn = os.path.join(dn, i)
-                        try:
-                            test = ImageFont.truetype(fn, self.get_attribute("label-size", 12))
+                        if FONTS.exists(fn):  # font will be loaded on first use
                             self._fonts[i] = fn
-                        except:
+                        else:
                             logger.warning(f"aircraft font file {fn} not loaded")
                     else:
                         logger.debug(f"aircraft font {i} already loaded")
@@ -388,15 +382,11 @@ class Aircraft:
                 if has_ext(i, ".wav") or has_ext(i, ".mp3"):
                     if i not in self._sounds.keys():
                         fn = os.path.join(dn, i)
-                        try:
-                            with open(fn, mode="rb") as file:  # b is important -> binary
-                                self._sounds[i] = file.read()
-                        except:
-                            logger.warning(f"custom sound file {fn} not loaded")
+                        self._sounds.register(i, fn)  # sound will be loaded on first use
                     else:
                         logger.debug(f"sound {i} already loaded")
 
-        logger.info(f"{len(self._sounds)} aircraft sounds loaded")
+        logger.info(f"{len(self._sounds)} aircraft sounds indexed")
 
     def load_observables(self):
         fn = os.path.abspath(os.path.join(self.acpath, CONFIG_FOLDER, RESOURCES_FOLDER, OBSERVABLES_FILE))
@@ -681,7 +671,8 @@ class Aircraft:
             self._name = Aircraft.get_aircraft_name_from_aircraft_path(acpath)
             logger.info(f"aircraft name set to {self._name}")
 
-            self.load_deck_types()
+            with STARTUP_PROFILE.phase("Aircraft.load_deck_types"):
+                self.load_deck_types()
             self.scan_web_decks()
 
             if len(self.devices) == 0:
@@ -689,8 +680,12 @@ class Aircraft:
                 return
 
             self.load_resources()
-            self.create_decks()
-            self.load_pages()
+            with STARTUP_PROFILE.phase("Aircraft.create_decks"):
+                self.create_decks()
+            with STARTUP_PROFILE.phase("Aircraft.load_pages"):
+                self.load_pages()
+            self.save_icon_cache()  # icons of first pages
+            self.cockpit.watch_page_files()
             self._running = True
         else:
             if acpath is None:
@@ -720,8 +715,12 @@ class Aircraft:
         logger.info("..removing aircraft resources..")
         self.decks = {}
         self._fonts = {}
-        self._icons = {}
-        self._sounds = {}
+        if self._icon_cache is not None:
+            self._icon_cache.save()
+            self._icon_cache.close()
+            self._icon_cache = None
+        self._icons = ResourceRegistry(loader=load_image)
+        self._sounds = ResourceRegistry(loader=load_bytes)
         self.unload_observables()
         self._observables = None
         self.cockpit.remove_aircraft_resources()
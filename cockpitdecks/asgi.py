@@ -0,0 +1,99 @@
+# Asynchronous (ASGI) application server for Cockpitdecks.
+#
+# All web deck websockets are handled on a single asyncio event loop,
+# rather than one thread per websocket with Flask development server.
+# The websocket protocol on /cockpit is the same. Other routes are served by the Flask application.
+#
+# Requires optional packages uvicorn and asgiref:
+#
+# pip install 'cockpitdecks[asgi]'
+#
+import logging
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from asgiref.wsgi import WsgiToAsgi
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+WEBSOCKET_PATH = "/cockpit"
+CODE = "code"
+
+
+class ASGIWebSocket:
+    """Websocket over ASGI receive and send channels"""
+
+    def __init__(self, receive, send):
+        self._receive = receive
+        self._send = send
+
+    async def accept(self):
+        await self._send({"type": "websocket.accept"})
+
+    async def receive(self) -> str | bytes | None:
+        """Returns next message, None when websocket is closed"""
+        while True:
+            message = await self._receive()
+            if message["type"] == "websocket.receive":
+                return message.get("text") if message.get("text") is not None else message.get("bytes")
+            if message["type"] == "websocket.disconnect":
+                return None
+
+    async def send(self, data: str | bytes):
+        if isinstance(data, bytes):
+            await self._send({"type": "websocket.send", "bytes": data})
+        else:
+            await self._send({"type": "websocket.send", "text": data})
+
+
+def create_app(app, cockpit):
+    """Returns ASGI application serving web deck websockets asynchronously and Flask app for other routes"""
+    http_app = WsgiToAsgi(app)
+    # Cockpit calls are run in a single worker thread, outside of the event loop,
+    # in the order they were received.
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ASGI::Cockpit")
+
+    def opened(deck: str, ws, formats: list | None, loop):
+        cockpit.register_deck(deck, ws, formats=formats, loop=loop)
+        cockpit.handle_code(1, deck)
+        logger.debug(f"handled deck={deck}, code=1")
+
+    async def cockpit_wshandler(receive, send):
+        loop = asyncio.get_running_loop()
+        ws = ASGIWebSocket(receive, send)
+        await ws.accept()
+        try:
+            while True:
+                data = await ws.receive()
+                if data is None:
+                    break
+                logger.debug(f"received {data}")
+                data = json.loads(data)
+                code = data.get(CODE)
+                if code == 1:
+                    await loop.run_in_executor(executor, opened, data.get("deck"), ws, data.get("formats"), loop)
+                elif code == 0 or code == 99:  # 99 is replay
+                    await loop.run_in_executor(executor, cockpit.handle_web_event, data)
+        finally:
+            logger.debug("connection closed")
+            await loop.run_in_executor(executor, cockpit.remove_client, ws)
+            logger.debug("client removed")
+
+    async def asgi_app(scope, receive, send):
+        if scope["type"] == "websocket":
+            if scope["path"] == WEBSOCKET_PATH:
+                await cockpit_wshandler(receive, send)
+            else:
+                await send({"type": "websocket.close"})
+            return
+        await http_app(scope, receive, send)
+
+    return asgi_app
+
+
+def serve(app, cockpit, host: str, port: int):
+    logger.info("starting asynchronous application server..")
+    uvicorn.run(create_app(app=app, cockpit=cockpit), host=host, port=port, lifespan="off", log_level="warning")
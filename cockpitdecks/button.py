@@ -51,6 +51,9 @@ class StateVariableValueProvider(ABC, ValueProvider):
 
 
 class Button(VariableListener, SimulatorVariableValueProvider, StateVariableValueProvider, ActivationValueProvider):
+
+    NOTIFY_ONCE_PER_BATCH = True  # button value is recomputed from all its variables
+
     def __init__(self, config: dict, page: "Page"):
         VariableListener.__init__(self)
 
@@ -80,6 +83,7 @@ class Button(VariableListener, SimulatorVariableValueProvider, StateVariableValu
 
         self.mosaic = self._definition.is_tile()
         self._part_of_multi = False
+        self._mosaic = None  # mosaic representation this tile is part of, set by mosaic
 
         # # Logging level
         # self.logging_level = config.get("logging-level", "INFO")
@@ -780,6 +784,20 @@ class Button(VariableListener, SimulatorVariableValueProvider, StateVariableValu
         """
         Ask deck to render this buttonon the deck. From the button's rendering, the deck will know what
         to ask to the button and render it.
+        If the deck has a render scheduler, the button is marked for rendering at the next frame.
+        Tiles of a mosaic signal their change to the mosaic, which gets rendered instead.
+        """
+        if self._mosaic is not None:
+            self._mosaic.tile_changed(self)
+            return
+        if self.deck is not None and self.deck.render_scheduler is not None and self.deck.render_scheduler.running:
+            self.deck.render_scheduler.mark_dirty(self)
+            return
+        self.render_now()
+
+    def render_now(self):
+        """
+        Ask deck to render this button on the deck immediately.
         """
         if self.deck is not None:
             if self.on_current_page() and not self.mosaic and not self._part_of_multi:
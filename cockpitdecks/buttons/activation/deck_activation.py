@@ -3,10 +3,9 @@ Button action and activation abstraction
 """
 
 import logging
-import threading
 
 from cockpitdecks.constant import ID_SEP
-from cockpitdecks.event import EncoderEvent, PushEvent, TouchEvent
+from cockpitdecks.event import AutoRepeatEvent, EncoderEvent, PushEvent, TouchEvent
 from cockpitdecks.resources.color import is_integer
 from cockpitdecks import CONFIG_KW, DECK_KW, DECK_ACTIONS
 from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
@@ -72,7 +71,7 @@ class Push(DeckActivation):
         self.auto_repeat = self.button.has_option("auto-repeat")
         self.auto_repeat_delay = Push.AUTO_REPEAT_DELAY
         self.auto_repeat_speed = Push.AUTO_REPEAT_SPEED
-        self.exit = None
+        self.timer = None  # registration with the cockpit animation clock while auto repeating
         self.set_auto_repeat()
 
         self.onoff_current_value = None
@@ -145,7 +144,7 @@ class Push(DeckActivation):
         if event.pressed:
             if not (self.has_long_press() or self.has_beginend_command()):  # we don't have to wait for the release to trigger the command
                 self._command.execute()
-            if self.auto_repeat and self.exit is None:
+            if self.auto_repeat and self.timer is None:
                 self.auto_repeat_start()
         else:
             if self.button.is_guarded():
@@ -158,21 +157,27 @@ class Push(DeckActivation):
         return True  # normal termination
 
     # Auto repeat
-    def auto_repeat_loop(self):
-        self.exit.wait(self.auto_repeat_delay)
-        while not self.exit.is_set():
-            self._command.execute()
-            self.exit.wait(self.auto_repeat_speed)
-        logger.debug("exited")
+    def auto_repeat_tick(self):
+        # Called by the cockpit animation clock, command is executed in the event loop
+        AutoRepeatEvent(activation=self)
+
+    def auto_repeat_execute(self):
+        # Called by the event loop
+        if self.timer is None:  # released while repetition was pending
+            return
+        self._command.execute()
 
     def auto_repeat_start(self):
         """
         Starts auto_repeat
         """
-        if self.exit is None:
-            self.exit = threading.Event()
-            self.thread = threading.Thread(target=self.auto_repeat_loop, name=f"Activation::auto_repeat({self.button_name})")
-            self.thread.start()
+        if self.timer is None:
+            self.timer = self.cockpit.animation_clock.register(
+                interval=self.auto_repeat_speed,
+                callback=self.auto_repeat_tick,
+                name=f"Activation::auto_repeat({self.button_name})",
+                delay=self.auto_repeat_delay,
+            )
         else:
             logger.warning(f"button {self.button_name}: already started")
 
@@ -180,13 +185,9 @@ class Push(DeckActivation):
         """
         Stops auto_repeat
         """
-        if self.exit is not None:
-            self.exit.set()
-            self.thread.join(timeout=2 * self.auto_repeat_speed)
-            if self.thread.is_alive():
-                logger.warning("..thread may hang..")
-            else:
-                self.exit = None
+        if self.timer is not None:
+            self.cockpit.animation_clock.unregister(self.timer)
+            self.timer = None
         else:
             logger.debug(f"button {self.button_name}: already stopped")
 
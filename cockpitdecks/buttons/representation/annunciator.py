@@ -2,7 +2,6 @@
 # Annunciator Rendering
 #
 import logging
-import threading
 from typing import Dict, List, Set
 from enum import Enum
 from PIL import Image, ImageDraw, ImageFilter
@@ -12,6 +11,7 @@ from cockpitdecks.resources.color import convert_color, light_off, is_number
 from cockpitdecks.simulator import SimulatorVariable
 from cockpitdecks.strvar import TextWithVariables
 from cockpitdecks.value import Value
+from cockpitdecks.resources.imagecache import ImageCache
 
 from .draw import DrawBase, ICON_SIZE
 
@@ -24,6 +24,13 @@ ANNUNCIATOR_DEFAULT_MODEL_PART = "A0"
 ANNUNCIATOR_DEFAULT_TEXT_COLOR = "white"
 DEFAULT_INVERT_COLOR = "white"
 
+# Korry glow
+KORRY_GLOW_RADIUS = [10, 4]  # px, one blurred copy per radius is added to the glow layer
+KORRY_GLOW_MARGIN = 3  # blur is computed around drawings, up to that number of radius
+
+# Glow layers (texts and leds, blurred for Korry style) shared by all annunciators, keyed on what was drawn
+GLOW_LAYERS = ImageCache(max_entries=512, max_bytes=32 * 1024 * 1024)
+
 
 class GUARD_TYPES(Enum):
     COVER = "cover"  # Full filled cover over the button
@@ -209,6 +216,29 @@ class AnnunciatorPart:
             return framed.lower() in ["true", "on", "yes", "1"]
         return False
 
+    def get_glow_key(self) -> tuple:
+        """Returns all inputs that have an influence on what the part draws in the glow layer."""
+        text = self._display.get_text()
+        if text is not None and text != "":
+            font = self.annunciator.get_font(self._display.font, self._display.size)
+            return (self.name, self.is_lit, self.get_color(), text, getattr(font, "path", None), getattr(font, "size", None), self.has_frame())
+        return (self.name, self.is_lit, self.get_color(), self.get_led(), self._config.get("bars"))
+
+    def render_invert(self, bgrd_draw):
+        # Invert is drawn on background layer, it does not glow
+        frame = (
+            (
+                self.center_w() - self.width() / 2,
+                self.center_h() - self.height() / 2,
+            ),
+            (
+                self.center_w() + self.width() / 2,
+                self.center_h() + self.height() / 2,
+            ),
+        )
+        bgrd_draw.rectangle(frame, fill=self.invert_color())
+        logger.debug(f"button {self.annunciator.button.name}: part {self.name}: lit reverse")
+
     def render(self, draw, bgrd_draw, icon_size, annun_width, annun_height, inside, size):
         self.set_sizes(annun_width, annun_height)
         TEXT_SIZE = int(self.height() / 2)  # @todo: find optimum variable text size depending on text length
@@ -227,18 +257,7 @@ class AnnunciatorPart:
 
             if self.is_lit or not self.annunciator.annunciator_style == ANNUNCIATOR_STYLES.VIVISUN:
                 if self.is_lit and self.is_invert():
-                    frame = (
-                        (
-                            self.center_w() - self.width() / 2,
-                            self.center_h() - self.height() / 2,
-                        ),
-                        (
-                            self.center_w() + self.width() / 2,
-                            self.center_h() + self.height() / 2,
-                        ),
-                    )
-                    bgrd_draw.rectangle(frame, fill=self.invert_color())
-                    logger.debug(f"button {self.annunciator.button.name}: part {self.name}: lit reverse")
+                    self.render_invert(bgrd_draw)
 
                 # logger.debug(f"button {self.button.name}: text '{text}' at ({self.center_w()}, {self.center_h()})")
                 if not self.is_lit and type(self.annunciator) != AnnunciatorAnimate:
@@ -364,6 +383,8 @@ class Annunciator(DrawBase):
 
     REPRESENTATION_NAME = "annunciator"
 
+    IMAGE_CACHE = True
+
     PARAMETERS_ORIG = {
         "icon": {"type": "icon", "prompt": "Icon"},
         "type": {"type": "string", "prompt": "Type", "lov": ["A", "B", "C", "D", "E", "F"]},
@@ -549,6 +570,11 @@ class Annunciator(DrawBase):
         self.annunciator_datarefs = r
         return self.annunciator_datarefs
 
+    def get_image_cache_inputs(self) -> tuple:
+        if self.annunciator_parts is None:
+            return ()
+        return tuple((k, v.is_lit, v._display.get_text()) for k, v in self.annunciator_parts.items())
+
     def get_current_values(self):
         """
         There is a get_current_value value per annunciator part.
@@ -579,6 +605,25 @@ class Annunciator(DrawBase):
         logger.debug(f"using uniform color {self.annun_color}")
         return image
 
+    def get_glow_key(self, annun_width: int, annun_height: int, size: str) -> tuple:
+        parts = tuple(part.get_glow_key() for part in self.annunciator_parts.values())
+        return (self.annunciator_style, self.annun_color, annun_width, annun_height, size, parts)
+
+    @staticmethod
+    def korry_glow(glow):
+        """Adds blurred copies of drawings to the glow layer.
+
+        Blur is only computed in the area around the drawings rather than on the whole layer.
+        """
+        bbox = glow.getbbox()
+        if bbox is None:  # nothing drawn
+            return
+        margin = KORRY_GLOW_MARGIN * max(KORRY_GLOW_RADIUS)
+        box = (max(bbox[0] - margin, 0), max(bbox[1] - margin, 0), min(bbox[2] + margin, glow.width), min(bbox[3] + margin, glow.height))
+        area = glow.crop(box)
+        for radius in KORRY_GLOW_RADIUS:
+            glow.alpha_composite(area.filter(ImageFilter.GaussianBlur(radius)), dest=box[:2])
+
     def get_image_for_icon(self):
         # If the part is not lit, a darker version is printed unless dark option is added to button
         # in which case nothing gets added to the button.
@@ -626,25 +671,25 @@ class Annunciator(DrawBase):
         bgrd_draw = ImageDraw.Draw(bgrd)
         annun_color = (*self.annun_color, 0) if len(self.annun_color) == 3 else self.annun_color
 
-        glow = Image.new(mode="RGBA", size=(annun_width, annun_height), color=annun_color)  # annunciator text and leds , color=(0, 0, 0, 0)
-        draw = ImageDraw.Draw(glow)
+        # Glow layer only depends on part texts, leds, colors and lit state, it is computed once per distinct state.
+        glow_key = self.get_glow_key(annun_width=annun_width, annun_height=annun_height, size=size)
+        glow = GLOW_LAYERS.get(glow_key)
+        if glow is None:
+            glow = Image.new(mode="RGBA", size=(annun_width, annun_height), color=annun_color)  # annunciator text and leds , color=(0, 0, 0, 0)
+            draw = ImageDraw.Draw(glow)
 
-        guard = Image.new(mode="RGBA", size=(ICON_SIZE, ICON_SIZE), color=annun_color)  # annunuciator optional guard
-        guard_draw = ImageDraw.Draw(guard)
+            for part in self.annunciator_parts.values():
+                part.render(draw, bgrd_draw, ICON_SIZE, annun_width, annun_height, inside, size)
 
-        for part in self.annunciator_parts.values():
-            part.render(draw, bgrd_draw, ICON_SIZE, annun_width, annun_height, inside, size)
-
-        # PART 1.2: Glowing texts, later because not nicely perfect.
-        if self.annunciator_style == ANNUNCIATOR_STYLES.KORRY:
-            # blurred_image = glow.filter(ImageFilter.UnsharpMask(radius=2, percent=200, threshold=10))
-            blurred_image1 = glow.filter(ImageFilter.GaussianBlur(10))  # self.annunciator.get("blurr", 10)
-            blurred_image2 = glow.filter(ImageFilter.GaussianBlur(4))  # self.annunciator.get("blurr", 10)
-            # blurred_image = glow.filter(ImageFilter.BLUR)
-            glow.alpha_composite(blurred_image1)
-            glow.alpha_composite(blurred_image2)
-            # glow = blurred_image
-            # logger.debug("blurred")
+            # PART 1.2: Glowing texts, later because not nicely perfect.
+            if self.annunciator_style == ANNUNCIATOR_STYLES.KORRY:
+                self.korry_glow(glow)
+            GLOW_LAYERS.put(glow_key, glow)
+        else:
+            for part in self.annunciator_parts.values():
+                part.set_sizes(annun_width, annun_height)
+                if part.is_lit and part.is_invert() and part._display.get_text() not in [None, ""]:
+                    part.render_invert(bgrd_draw)
 
         # PART 1.3: Seal
         if self.button.has_option("seal"):
@@ -695,6 +740,8 @@ class Annunciator(DrawBase):
 
         # PART 4: Guard
         if self.button.has_guard():
+            guard = Image.new(mode="RGBA", size=(ICON_SIZE, ICON_SIZE), color=annun_color)  # annunuciator optional guard
+            guard_draw = ImageDraw.Draw(guard)
             cover = self.button.guarded.get(CONFIG_KW.ANNUNCIATOR_MODEL.value, GUARD_TYPES.COVER.value)  # CONFIG_KW.ANNUNCIATOR_MODEL.value = "model"
             guard_color = self.button.guarded.get("color", "red")
             guard_color = convert_color(guard_color)
@@ -757,18 +804,14 @@ class AnnunciatorAnimate(Annunciator):
 
         # Working attributes
         self.running = None  # state unknown
-        self.thread = None
-        self.exit = None
+        self.timer = None
         self.blink = True
 
-    def loop(self):
-        self.exit = threading.Event()
-        while not self.exit.is_set():
-            self.button.render()
-            self.blink = not self.blink
-            self.all_lit(self.blink)
-            self.exit.wait(self.speed)
-        logger.debug(f"exited")
+    def tick(self):
+        # Called by the cockpit animation clock, blinkers with same speed flash together
+        self.blink = not self.blink
+        self.all_lit(self.blink)
+        self.button.render()
 
     def should_run(self) -> bool:
         """
@@ -784,9 +827,8 @@ class AnnunciatorAnimate(Annunciator):
         Starts animation
         """
         if not self.running:
-            self.thread = threading.Thread(target=self.loop, name=f"ButtonAnimate::loop({self.button.name})")
             self.running = True
-            self.thread.start()
+            self.timer = self.button.deck.cockpit.animation_clock.register(interval=self.speed, callback=self.tick, name=f"ButtonAnimate({self.button.name})")
         else:
             logger.warning(f"button {self.button.name}: already started")
 
@@ -796,10 +838,8 @@ class AnnunciatorAnimate(Annunciator):
         """
         if self.running:
             self.running = False
-            self.exit.set()
-            self.thread.join(timeout=2 * self.speed)
-            if self.thread.is_alive():
-                logger.warning(f"button {self.button.name}: did not get finished signal")
+            self.button.deck.cockpit.animation_clock.unregister(self.timer)
+            self.timer = None
             self.all_lit(False)
             if render:
                 return super().render()
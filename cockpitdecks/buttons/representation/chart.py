@@ -2,14 +2,15 @@
 # Buttons that are drawn on render()
 #
 import logging
-import threading
 import math
+import threading
 
 from PIL import ImageDraw
 
 from cockpitdecks import now
 
 from cockpitdecks.resources.color import convert_color
+from cockpitdecks.resources.ts import TimeRingBuffer
 from cockpitdecks.variable import Variable, VariableListener
 from .draw import DrawBase, ICON_SIZE
 from .draw_animation import DrawAnimation
@@ -21,6 +22,8 @@ logger = logging.getLogger(__name__)
 
 MAX_UPDATE_RATE = 4  # per seconds
 MAX_SPARKLINES = 3
+MAX_POINTS = 2048  # per chart, when the number of points to keep is not known
+MAX_SAMPLE_RATE = 60  # per second, to size charts that keep time-width seconds of variable changes
 
 
 #
@@ -41,7 +44,7 @@ class ChartData(DrawBase, VariableListener):
         # values
         self.value = Value(name=name, config=config, provider=chart.button)
 
-        self.data = []
+        self.data: TimeRingBuffer | None = None  # created in init(), when number of points is known
         self.last_data = now().timestamp()
 
         # Vertical axis, assumes default values
@@ -56,15 +59,22 @@ class ChartData(DrawBase, VariableListener):
         self.time_width: float | None = config.get("time-width")
         self.rate = config.get("rate", False)
 
-        self._stop = threading.Event()
-        self._stop.set()
-        self.thread = None
+        self.timer = None  # registration with the cockpit animation clock
 
         # presentation
         self.scale = config.get("scale", 1)
         self.color = config.get("color", "grey")
         self.color = convert_color(self.color)
-        self._cached = None
+
+        # plot, scrolled and completed with new points on each render
+        self._plot = None
+        self._plot_time = 0.0  # time at left edge of plot, newest
+        self._plotted = None  # timestamp of last point plotted
+        self._dirty = True  # new data since last plot
+        self._redraw = True  # plot must be redrawn entirely
+        self._capacity_warned = False
+        # data and plot state are changed by the animation clock or simulator thread, and read by the render thread
+        self._lock = threading.RLock()
 
         VariableListener.__init__(self, name=name)
         DrawBase.__init__(self, button=chart.button)
@@ -78,6 +88,12 @@ class ChartData(DrawBase, VariableListener):
         else:
             if self.auto_update and self.keep == 0:
                 self.keep = math.ceil(self.time_width / self.update)
+        capacity = self.keep
+        if capacity == 0:
+            capacity = MAX_POINTS
+            if self.time_width is not None:
+                capacity = max(capacity, math.ceil(self.time_width * MAX_SAMPLE_RATE))
+        self.data = TimeRingBuffer(capacity=capacity)
         if not self.auto_update:
             for d in self.get_variables():
                 dref = self.chart.button.sim.get_variable(d)
@@ -100,31 +116,29 @@ class ChartData(DrawBase, VariableListener):
         return self.time_width
 
     def invalidate_representation(self):
-        self._cached = None
+        with self._lock:
+            self._plot = None
+            self._redraw = True
 
     # (Optional) Automation of data collection
     def start(self):
-        if not self._stop.is_set():
-            logger.warning(f"chart {self.name} already started ({self.thread.is_alive() if self.thread is not None else 'no thread'})")
+        if self.timer is not None:
+            logger.warning(f"chart {self.name} already started")
             return
         if self.update is not None and self.update > 0:
-            self._stop.clear()
-            self.thread = threading.Thread(target=self.loop, name=f"ChartData:{self.name}")
-            self.thread.start()
+            self.timer = self.chart.button.deck.cockpit.animation_clock.register(interval=self.update, callback=self.tick, name=f"ChartData({self.name})")
+            logger.debug(f"chart {self.name} started")
 
-    def loop(self):
-        logger.debug(f"chart {self.name} started")
-        while not self._stop.wait(self.update):
-            r = self.value.value
-            self.add(r)
-        logger.debug(f"chart {self.name} stopped")
+    def tick(self):
+        # Called by the cockpit animation clock
+        r = self.value.value
+        self.add(r)
 
     def stop(self):
-        if not self._stop.is_set():
-            self._stop.set()
-            logger.debug(f"chart {self.name} will stop at next update")
-            e = self.thread.join(timeout=self.update)
-            logger.debug(f"chart {self.name}: thread terminated")
+        if self.timer is not None:
+            self.chart.button.deck.cockpit.animation_clock.unregister(self.timer)
+            self.timer = None
+            logger.debug(f"chart {self.name} stopped")
 
     def variable_changed(self, variable: Variable):
         if variable.name not in self.variables:
@@ -137,68 +151,79 @@ class ChartData(DrawBase, VariableListener):
         self.add(r)
 
     def add(self, value, timestamp=None):
-        self.last_data = timestamp if timestamp is not None else now().timestamp()
-        self.data.append((value, self.last_data))
-        if self.keep > 0:  # we know the number of points to keep
-            if len(self.data) > self.keep:
-                data = sorted(self.data, key=lambda x: x[1])
-                self.data = data[-self.keep :]
-        else:  # must use time, only keeps time_width more recent points
-            maxtime = now().timestamp() - self.time_width  # in the past
-            data = filter(lambda x: x[1] > maxtime, self.data)
-            self.data = sorted(data, key=lambda x: x[1])
-            if len(self.data) == 0:
-                logger.warning(f"chart {self.name}: no data")
-        self.invalidate_representation()
+        with self._lock:
+            self.last_data = timestamp if timestamp is not None else now().timestamp()
+            if self._plotted is not None and self.last_data <= self._plotted:
+                self._redraw = True  # late point, in plotted part
+            dropped = self.data.append(value, self.last_data)
+            if self.time_width is not None:
+                if dropped is not None and dropped[1] > now().timestamp() - self.time_width:
+                    self._redraw = True  # visible point dropped
+                    if self.keep == 0 and not self._capacity_warned:
+                        logger.warning(f"chart {self.name}: more than {self.data.capacity} points in {self.time_width} seconds, oldest visible points dropped")
+                        self._capacity_warned = True
+                if self.keep == 0:  # must use time, only keeps time_width more recent points
+                    self.data.drop_before(now().timestamp() - self.time_width)  # in the past
+                    if len(self.data) == 0:
+                        logger.warning(f"chart {self.name}: no data")
+            self._dirty = True
         self.render()
 
-    def get_rate(self):
+    @staticmethod
+    def rate_of(data: list) -> list:
         rate = []
-        if len(self.data) > 1:
+        if len(data) > 1:
             p = None
-            for d in self.data:
+            for d in data:
                 if p is not None:
                     rate.append(((d[0] - p[0]) / (d[1] - p[1]), d[1]))
                 p = d
         else:
-            if len(self.data) == 1:
-                rate = self.data
+            if len(data) == 1:
+                rate = data
         return rate
 
-    def get_data(self):
-        return self.get_rate() if self.rate else self.data
+    def get_rate(self):
+        return ChartData.rate_of(list(self.data))
+
+    def get_data(self, since: float | None = None, before: int = 0) -> list:
+        """Returns points more recent than since, preceded by up to before older points, all points if since is None"""
+        if self.rate:
+            if since is None:
+                return self.get_rate()
+            return ChartData.rate_of(self.data.since(since, before=before + 1))
+        return self.data.since(since, before=before)
 
-    def get_image_for_icon(self):
-        """
-        Helper function to get button image and overlay label on top of it.
-        Label may be updated at each activation since it can contain datarefs.
-        Also add a little marker on placeholder/invalid buttons that will do nothing.
+    def scroll(self, time_left: float, time_pix: float) -> bool:
+        """Moves plot to the right for the time elapsed since it was drawn.
+
+        Plot moves by whole pixels, remaining time is kept for next scroll.
+        Returns False if plot has to be drawn entirely.
         """
-        if self._cached is not None:
-            return self._cached  # data unchanged, plot unchanged
+        dx = int((time_left - self._plot_time) * time_pix)
+        if dx <= 0:
+            return True
+        if dx >= self._plot.width:
+            return False
+        image, _ = self.double_icon(width=self._plot.width, height=self._plot.height)
+        image.paste(self._plot.crop((0, 0, self._plot.width - dx, self._plot.height)), (dx, 0))
+        self._plot = image
+        self._plot_time = self._plot_time + dx / time_pix
+        return True
 
-        inside = round(0.04 * ICON_SIZE + 0.5)
-        image, chart = self.double_icon(width=int(ICON_SIZE - 2 * inside), height=int(ICON_SIZE * 7 / 8 - 2 * inside))
-
-        time_pix = image.width / self.time_width
-        time_left = now().timestamp()
-
-        # image (0, height) is graph (0,0)
-        # image (width,0) is graph(maxtime, maxvalue)
-        # data is sorted in truncate
-        # plot = sorted(self.data, key=lambda v: v[1])  # sort by timestamp
-        plot = self.get_data()
-        vert_pix = image.height / (self.value_max - self.value_min)  # available for plot
-        vert_zero = image.height
+    def plot(self, chart, points: list, time_pix: float, height: int):
+        """Draws points on plot, x=0 is self._plot_time"""
+        vert_pix = height / (self.value_max - self.value_min)  # available for plot
+        vert_zero = height
         if self.type == "point":
             radius = 2
-            for pt in plot:
+            for pt in points:
                 pt_value, pt_time = pt
                 if pt_value < self.value_min:
                     pt_value = self.value_min
                 if pt_value > self.value_max:
                     pt_value = self.value_max
-                x = (time_left - pt_time) * time_pix
+                x = (self._plot_time - pt_time) * time_pix
                 y = vert_zero - (vert_pix * (pt_value - self.value_min))
                 box = ((int(x) - radius, int(y) - radius), (int(x) + radius, int(y) + radius))
                 chart.ellipse(
@@ -207,35 +232,69 @@ class ChartData(DrawBase, VariableListener):
                     fill=self.color,
                 )
         elif self.type in ["line", "curve"]:
-            points = []
-            for pt in plot:
+            line = []
+            for pt in points:
                 pt_value, pt_time = pt
                 if pt_value < self.value_min:
                     pt_value = self.value_min
                 if pt_value > self.value_max:
                     pt_value = self.value_max
-                x = (time_left - pt_time) * time_pix
+                x = (self._plot_time - pt_time) * time_pix
                 y = vert_zero - (vert_pix * (pt_value - self.value_min))
-                points.append((int(x), int(y)))
+                line.append((int(x), int(y)))
             chart.line(
-                points,
+                line,
                 width=3,
                 fill=self.color,
             )
         elif self.type in ["bar", "bars", "histogram"]:
             barwidth = int(self.update * time_pix * 0.8)
-            for pt in plot:
+            for pt in points:
                 pt_value, pt_time = pt
-                x = (time_left - pt_time) * time_pix
+                x = (self._plot_time - pt_time) * time_pix
                 y = vert_zero - (vert_pix * (pt_value - self.value_min))
-                bbox = [(x, y), (x + barwidth, image.height)]  # ((int(x), int(y)))
+                bbox = [(x, y), (x + barwidth, height)]  # ((int(x), int(y)))
                 chart.rectangle(
                     bbox,
                     fill=self.color,
                 )
 
-        self._cached = image
-        return self._cached
+    def get_image_for_icon(self):
+        """
+        Helper function to get button image and overlay label on top of it.
+        Label may be updated at each activation since it can contain datarefs.
+        Also add a little marker on placeholder/invalid buttons that will do nothing.
+
+        The plot is kept between renders. On new data, it is scrolled to the right
+        for the time elapsed and only new points are drawn.
+        """
+        with self._lock:
+            if self._plot is not None and not self._dirty:
+                return self._plot  # data unchanged, plot unchanged
+
+            inside = round(0.04 * ICON_SIZE + 0.5)
+            width = int(ICON_SIZE - 2 * inside)
+            height = int(ICON_SIZE * 7 / 8 - 2 * inside)
+            time_pix = width / self.time_width
+            time_left = now().timestamp()
+
+            # image (0, height) is graph (0,0)
+            # image (width,0) is graph(maxtime, maxvalue)
+            if self._plot is None or self._redraw or self._plotted is None or not self.scroll(time_left, time_pix):
+                self._plot, chart = self.double_icon(width=width, height=height)
+                self._plot_time = time_left
+                points = self.get_data()
+            else:
+                chart = ImageDraw.Draw(self._plot)
+                points = self.get_data(since=self._plotted, before=1 if self.type in ["line", "curve"] else 0)
+                if self.type not in ["line", "curve"]:  # older point already drawn
+                    points = [p for p in points if p[1] > self._plotted]
+            self.plot(chart, points, time_pix=time_pix, height=height)
+
+            self._plotted = self.data.last_time()
+            self._dirty = False
+            self._redraw = False
+            return self._plot
 
     def render(self):
         self.chart.button.render()
@@ -2,7 +2,6 @@
 # Buttons that are drawn on render()
 #
 import logging
-import threading
 
 from .draw import DrawBase
 
@@ -39,16 +38,12 @@ class DrawAnimation(DrawBase):
         self.tween = 0
 
         self.running: bool | None = None  # state unknown
-        self.exit = None
-        self.thread = None
+        self.timer = None
 
-    def loop(self):
-        self.exit = threading.Event()
-        while not self.exit.is_set():
-            self.animate()
-            self.button.render()
-            self.exit.wait(self.speed)
-        logger.debug("exited")
+    def tick(self):
+        # Called by the cockpit animation clock
+        self.animate()
+        self.button.render()
 
     def should_run(self) -> bool:
         """
@@ -74,8 +69,7 @@ class DrawAnimation(DrawBase):
         """
         if not self.running and self.speed is not None:
             self.running = True
-            self.thread = threading.Thread(target=self.loop, name=f"ButtonAnimate::loop({self.button.name})")
-            self.thread.start()
+            self.timer = self.button.deck.cockpit.animation_clock.register(interval=self.speed, callback=self.tick, name=f"ButtonAnimate({self.button.name})")
             logger.debug("started")
         else:
             logger.warning(f"button {self.button.name}: already started")
@@ -86,16 +80,8 @@ class DrawAnimation(DrawBase):
         """
         if self.running:
             self.running = False
-            self.exit.set()
-            try:
-                wait = 2 * (self.speed if self.speed is not None else 5)
-                if wait < 5:
-                    wait = 5
-                self.thread.join(timeout=wait)
-                if self.thread.is_alive():
-                    logger.warning(f"button {self.button.name}: animation did not terminate (timetout {wait}secs.)")
-            except:
-                pass
+            self.button.deck.cockpit.animation_clock.unregister(self.timer)
+            self.timer = None
             logger.debug("stopped")
         else:
             logger.debug(f"button {self.button.name}: already stopped")
@@ -7,6 +7,7 @@ import math
 from PIL import Image
 
 from cockpitdecks.resources.color import convert_color, grey
+from cockpitdecks.resources.imagecache import ImageCache
 from cockpitdecks.strvar import TextWithVariables
 from .draw import DrawBase, ICON_SIZE  # explicit Icon from file to avoid circular import
 
@@ -27,6 +28,8 @@ RULE_COLOR = grey(255)
 TICK_COLOR = grey(255)
 LABEL_COLOR = grey(255)
 
+GAUGE_FRAME_CACHE_MAX_ENTRIES = 64  # per gauge, dial with needle at a given angle
+
 
 #
 # ###############################
@@ -284,22 +287,19 @@ class TapeIcon(DrawBase):
             self._tape = image
 
         # Use tape
-        # 2a. Move whole drawing around
+        # 2a. Move whole drawing around: the tape is only translated,
+        # visible window is cropped from the tape rather than transforming the whole tape.
         r = self.button.value
         if r is None:
             r = self.value_min
         value = r - self.value_min
-        a = 1
-        b = 0
         c = 0
-        d = 0
-        e = 1
         f = 0
         if self.vertical:
-            f = self.offset - ICON_SIZE / 2 + value * self.step
+            f = round(self.offset - ICON_SIZE / 2 + value * self.step)
         else:
-            c = self.offset - ICON_SIZE / 2 + value * self.step
-        tape = self._tape.transform(self._tape.size, Image.AFFINE, (a, b, c, d, e, f))
+            c = round(self.offset - ICON_SIZE / 2 + value * self.step)
+        tape = self._tape.crop((c, f, c + ICON_SIZE, f + ICON_SIZE))  # outside of tape is transparent
 
         # print("RESULT", r, value, self.offset, a, b, c, d, e, f)
 
@@ -325,6 +325,7 @@ class GaugeIcon(DrawBase):
     PARAMETERS = {
         "top-line-color": {"type": "color", "prompt": "Top line color"},
         "gauge-size": {"label": "Gauge Size", "type": "int"},
+        "needle-step": {"label": "Needle step (degrees)", "type": "float"},
     }
 
     def __init__(self, button: "Button"):
@@ -374,9 +375,15 @@ class GaugeIcon(DrawBase):
         self.needle_underline_width = self.get_attribute("needle-underline-width", default=4)
         self.needle_underline_color = self.get_attribute("needle-underline-color", default=NEEDLE_UNDERLINE_COLOR)
         self.needle_underline_color = convert_color(self.needle_underline_color)
+        # Needle angle is rounded to needle-step degrees, 0 means no rounding.
+        # With rounding, close values produce the same frame which is reused from cache.
+        # Without rounding, rotations rarely repeat and frames are not cached.
+        self.needle_step = self.gauge.get("needle-step", 0)
 
+        # Layers: static dial face is drawn once, only the needle is rotated per value
         self._gauge = None
         self._needle = None
+        self._frames = ImageCache(max_entries=GAUGE_FRAME_CACHE_MAX_ENTRIES) if self.needle_step > 0 else None  # rotation: dial with needle
 
     def get_image_for_icon(self):
         """
@@ -488,11 +495,18 @@ class GaugeIcon(DrawBase):
             rotation = self.tick_from
         if rotation > self.tick_to:
             rotation = self.tick_to
-        rotated_needle = self._needle.rotate(-rotation, resample=Image.Resampling.NEAREST, center=self.center)
-
-        bg = self._gauge.copy()
-        bg.alpha_composite(rotated_needle)
-        return bg
+        if self.needle_step > 0:
+            rotation = round(rotation / self.needle_step) * self.needle_step
+
+        frame = self._frames.get(rotation) if self._frames is not None else None
+        if frame is None:
+            rotated_needle = self._needle.rotate(-rotation, resample=Image.Resampling.NEAREST, center=self.center)
+            frame = self._gauge.copy()
+            frame.alpha_composite(rotated_needle)
+            if self._frames is None:
+                return frame
+            self._frames.put(rotation, frame)
+        return frame.copy()
 
 
 class CompassIcon(GaugeIcon):
@@ -3,10 +3,13 @@ All representations for Icon/image based.
 """
 
 import logging
+import itertools
 
 from PIL import ImageDraw, ImageFont
 
 from cockpitdecks.resources.color import convert_color, has_ext, add_ext
+from cockpitdecks.resources.fontcache import FONTS
+from cockpitdecks.resources.imagecache import RENDERED_IMAGES
 from cockpitdecks import CONFIG_KW, DECK_FEEDBACK
 from .representation import Representation
 from cockpitdecks.strvar import TextWithVariables
@@ -24,6 +27,8 @@ logger = logging.getLogger(__name__)
 NO_ICON = "no-icon"
 VU = "VU"  # virtual unit code number
 
+_IMAGE_CACHE_IDS = itertools.count()  # unique id per representation instance, never reused
+
 
 class IconBase(Representation):
     """Abstract icon class
@@ -34,6 +39,10 @@ class IconBase(Representation):
     REPRESENTATION_NAME = "icon-base-do-not-use"
     REQUIRED_DECK_FEEDBACKS = DECK_FEEDBACK.IMAGE
 
+    # Representations whose image only depends on the inputs returned by get_image_cache_key()
+    # can have their rendered images cached.
+    IMAGE_CACHE = False
+
     PARAMETERS = {"cockpit-color": {"type": "color", "prompt": "Cockpit color"}, "cockpit-texture": {"type": "icon", "prompt": "Cockpit Texture"}}
 
     def __init__(self, button: "Button"):
@@ -53,16 +62,42 @@ class IconBase(Representation):
         self.cockpit_texture = button.get_attribute("cockpit-texture")
 
         self._icon_cache = None
+        self._image_cache_id = next(_IMAGE_CACHE_IDS)
 
     def is_valid(self):
         return super().is_valid()
 
     def render(self):
-        return self.get_image()
+        if not self.IMAGE_CACHE:
+            return self.get_image()
+        key = self.get_image_cache_key()
+        image = RENDERED_IMAGES.get(key)
+        if image is None:
+            image = self.get_image()
+            if image is None:
+                return None
+            RENDERED_IMAGES.put(key, image)
+        return image.copy()  # decks alter the image they receive (resize, corners...)
+
+    def get_image_cache_key(self) -> tuple:
+        """
+        Returns all inputs that have an influence on the rendered image.
+        Two renders with the same key produce the same image.
+        """
+        label = self._label.get_text() if self._label is not None else None
+        return (self._image_cache_id, repr(self.button.value), label, self.button.is_guarded()) + self.get_image_cache_inputs()
+
+    def get_image_cache_inputs(self) -> tuple:
+        """
+        Returns representation specific inputs that have an influence on the rendered image,
+        in addition to the button value and label.
+        """
+        return ()
 
     def get_font(self, fontname: str, fontsize: int):
         """
-        Helper function to get valid font, depending on button or global preferences
+        Helper function to get valid font, depending on button or global preferences.
+        Fonts are loaded once and shared through the process-wide font registry.
         """
         deck = self.button.deck
         cockpit = deck.cockpit
@@ -85,26 +120,34 @@ class IconBase(Representation):
         # 1. Tries button specific font
         f = try_ext(fontname)
         if f is not None:
-            return ImageFont.truetype(f, fontsize)
+            font = FONTS.get(f, fontsize)
+            if font is not None:
+                return font
 
         # 2. Tries default fonts
         default_font = self.button.get_attribute("label-font")
         if default_font is not None:
             f = try_ext(default_font)
             if f is not None:
-                return ImageFont.truetype(f, fontsize)
+                font = FONTS.get(f, fontsize)
+                if font is not None:
+                    return font
 
         # 3. Returns first font, if any
         if len(fonts_available) > 0:
             f = all_fonts[fonts_available[0]]
             logger.warning(f"button {this_button} cockpit default label font not found in {fonts_available}. Returning first font found ({f})")
-            return ImageFont.truetype(f, fontsize)
+            font = FONTS.get(f, fontsize)
+            if font is not None:
+                return font
 
         # 5. Tries cockpit default font
         default_font = cockpit.default_font
         f = try_ext(default_font)
         if f is not None:
-            return ImageFont.truetype(f, fontsize)
+            font = FONTS.get(f, fontsize)
+            if font is not None:
+                return font
 
         logger.error("no font, using pillow default")
         return ImageFont.load_default()
@@ -248,6 +291,8 @@ class Icon(IconBase):
     # PARAMETERS = {"icon": {"type": "icon", "prompt": "Icon"}, "frame": {"type": "icon", "prompt": "Frame"}}
     PARAMETERS = IconBase.PARAMETERS | {"icon": {"type": "icon", "prompt": "Icon"}}
 
+    IMAGE_CACHE = True
+
     def __init__(self, button: "Button"):
         IconBase.__init__(self, button=button)
 
@@ -279,6 +324,9 @@ class Icon(IconBase):
         self._icon_cache = None
         super().clean_cache()
 
+    def get_image_cache_inputs(self) -> tuple:
+        return (self.icon,)  # may change on each render (multi-icons, animation)
+
     def get_image_for_icon(self):
         deck = self.button.deck
         image = deck.cockpit.get_icon_image(self.icon)
@@ -402,6 +450,8 @@ class IconColor(IconBase):
 
     PARAMETERS = IconBase.PARAMETERS | {"color": {"type": "color", "prompt": "Color"}, "texture": {"type": "icon", "prompt": "Texture"}}
 
+    IMAGE_CACHE = True
+
     def __init__(self, button: "Button"):
         IconBase.__init__(self, button=button)
 
@@ -409,6 +459,9 @@ class IconColor(IconBase):
         self.icon_color = convert_color(self.icon_color)
         self.icon_texture = self.get_attribute("icon-texture")
 
+    def get_image_cache_inputs(self) -> tuple:
+        return (str(self.icon_color), self.icon_texture)
+
     def get_image_for_icon(self):
         return self.button.deck.create_icon_for_key(index=self.button.index, colors=self.icon_color, texture=self.icon_texture)
 
@@ -470,6 +523,10 @@ class IconText(IconColor):
             datarefs = self._text.get_variables()
         return datarefs
 
+    def get_image_cache_inputs(self) -> tuple:
+        text = self._text.get_text() if self._text is not None else None
+        return super().get_image_cache_inputs() + (id(self._text), text)  # multi-texts swaps _text
+
     def get_image(self):
         """
         Helper function to get button image and overlay label on top of it.
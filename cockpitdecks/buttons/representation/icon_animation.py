@@ -2,7 +2,6 @@
 # Buttons that are drawn on render()
 #
 import logging
-import threading
 
 from .icon import MultiIcons
 
@@ -41,17 +40,13 @@ class IconAnimation(MultiIcons):
         # Internal variables
         self.counter = 0
         self.running = False
-        self.exit: threading.Event | None = None
-        self.thread: threading.Thread | None = None
-
-    def loop(self):
-        self.exit = threading.Event()
-        while not self.exit.is_set():
-            self.button.render()
-            self.counter = self.counter + 1
-            self.button.value = self.counter  # get_current_value() will fetch self.counter value
-            self.exit.wait(self.speed)
-        logger.debug(f"exited")
+        self.timer = None
+
+    def tick(self):
+        # Called by the cockpit animation clock
+        self.counter = self.counter + 1
+        self.button.value = self.counter  # get_current_value() will fetch self.counter value
+        self.button.render()
 
     def should_run(self) -> bool:
         """
@@ -66,8 +61,7 @@ class IconAnimation(MultiIcons):
         """
         if not self.running:
             self.running = True
-            self.thread = threading.Thread(target=self.loop, name=f"ButtonAnimate::loop({self.button_name})")
-            self.thread.start()
+            self.timer = self.button.deck.cockpit.animation_clock.register(interval=self.speed, callback=self.tick, name=f"ButtonAnimate({self.button_name})")
         else:
             logger.warning(f"button {self.button_name}: already started")
 
@@ -75,12 +69,10 @@ class IconAnimation(MultiIcons):
         """
         Stops animation
         """
-        if self.running and self.exit is not None and self.thread is not None:
+        if self.running:
             self.running = False
-            self.exit.set()
-            self.thread.join(timeout=2 * self.speed)
-            if self.thread.is_alive():
-                logger.warning(f"..thread may hang..")
+            self.button.deck.cockpit.animation_clock.unregister(self.timer)
+            self.timer = None
             if render:
                 self.render()
         else:
@@ -109,6 +101,13 @@ class IconAnimation(MultiIcons):
         self.icon = self.icon_off
         return super(MultiIcons, self).render()
 
+    def get_image_cache_key(self) -> tuple:
+        # Button value is the animation counter, which grows forever and would never hit the cache.
+        # Image only depends on the displayed frame.
+        key = super().get_image_cache_key()
+        frame = self.counter % len(self.multi_icons) if len(self.multi_icons) > 0 else 0
+        return key[:1] + (frame,) + key[2:]
+
     def describe(self) -> str:
         """
         Describe what the button does in plain English
@@ -1,4 +1,5 @@
 import logging
+import threading
 
 from cockpitdecks import DECK_KW
 from .icon import IconBase
@@ -60,13 +61,24 @@ class MultiButtons(IconBase):
 
 
 class Mosaic(MultiButtons):
-    """A Mosaic is an icon that is split into several smaller icon"""
+    """A Mosaic is an icon that is split into several smaller icon
+
+    The composed image is kept. Tiles signal their changes to the mosaic,
+    only changed tiles are rendered and pasted again over their background.
+    Scaled images of tiles are kept for when the whole mosaic has to be composed again.
+    """
 
     REPRESENTATION_NAME = "mosaic"
 
     PARAMETERS = {}
 
     def __init__(self, button: "Button"):
+        self._composed = None  # last composed image
+        self._background = None  # background of composed image
+        self._background_key = None  # (color, texture) of background
+        self._scaled = {}  # {tile name: scaled tile image}
+        self._dirty_tiles = set()  # names of tiles changed since last render
+        self._dirty_lock = threading.Lock()
         MultiButtons.__init__(self, button=button)
 
     @property
@@ -89,32 +101,60 @@ class Mosaic(MultiButtons):
             pseudo_deck_type = self.button._definition.mosaic
             if pseudo_deck_type is not None:
                 self.tiles = self.button.page.load_buttons(buttons=buttons, deck_type=pseudo_deck_type)
+                for tile in self.tiles:
+                    tile._mosaic = self
                 logger.debug(f"load_tiles: loaded tiles {', '.join([t.name for t in self.tiles])}")
             else:
                 logger.warning(f"{self.button.name}: no mosaic definition, not button loaded")
         else:
             logger.warning(f"{self.button.name}: no tile buttons")
 
-    def place_tile(self, tile, image):
+    def tile_changed(self, tile):
+        """Called by tile when it needs rendering, mosaic is rendered instead.
+
+        When the deck renders at a limited frame rate, the mosaic is rendered at most once per frame,
+        whatever the number of changed tiles.
+        """
+        with self._dirty_lock:
+            self._dirty_tiles.add(tile.name)
+        self.button.render()
+
+    def place_tile(self, tile, image, refresh: bool = True):
         dimensions = tile._definition.display_size()
-        portion = tile.get_representation()
-        if portion is None:
-            logger.warning(f"mosaic: tile {tile.name} has no image")
-            return
-        portion = portion.resize(dimensions)
         position = tile._definition.get_offset()
         dest = (position[0], position[1], position[0] + dimensions[0], position[1] + dimensions[1])
+        portion = self._scaled.get(tile.name)
+        if refresh or portion is None:
+            portion = tile.get_representation()
+            if portion is None:
+                logger.warning(f"mosaic: tile {tile.name} has no image")
+                return
+            portion = portion.resize(dimensions)
+            self._scaled[tile.name] = portion
         logger.debug(f"place_tile: {self.button.name}, {image.size}, {tile.name}, {dimensions}, {position}, {dest}")
+        image.paste(self._background.crop(dest), dest)  # tile may be transparent, restore background first
         image.paste(portion, dest, portion)
 
     def render(self):
-        # Warning: Do not update Mosaic too often because it may lead to performance issue:
-        # Recall that a mosaic update request the update of all underlying tiles.
-        # Make sure individual tiles DO cache their representation to speed up process.
-        # IF all "but one" representation is invalid and all other are cached, there is no problem.
-        # The overhead here, to paste together all tiles is negligible.
-        # But the building of each individual tile is not.
-        image = self.button.deck.create_icon_for_key(self.button.index, colors=self.cockpit_color, texture=self.cockpit_texture)
+        # Only tiles that changed since last render are rendered and pasted.
+        # The whole mosaic is composed again on first render or when its background changes,
+        # using kept scaled images of tiles that did not change.
+        with self._dirty_lock:
+            dirty = self._dirty_tiles
+            self._dirty_tiles = set()
+        background_key = (self.cockpit_color, self.cockpit_texture)
+        compose = self._composed is None or self._background_key != background_key
+        if compose:
+            self._background = self.button.deck.create_icon_for_key(self.button.index, colors=self.cockpit_color, texture=self.cockpit_texture)
+            self._background_key = background_key
+            self._composed = self._background.copy()
         for tile in self.tiles:
-            self.place_tile(tile, image)
-        return image
+            refresh = tile.name in dirty or tile.name not in self._scaled
+            if compose or refresh:
+                self.place_tile(tile, self._composed, refresh=refresh)
+        return self._composed.copy()
+
+    def clean_cache(self):
+        self._composed = None
+        self._scaled = {}
+        super().clean_cache()
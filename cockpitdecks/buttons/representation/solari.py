@@ -2,10 +2,15 @@
 # Buttons that are drawn on render()
 #
 import logging
+import math
+import threading
 from functools import reduce
 
+from PIL import Image, ImageDraw
+
 from cockpitdecks import CONFIG_KW, yaml
 
+from .draw import TRANSPARENT_PNG_COLOR
 from .draw_animation import DrawAnimation
 
 logger = logging.getLogger(__name__)
@@ -78,6 +83,52 @@ def solari(text, last_text: str | None = None, mode: str = AS_ONE):
             yield "".join(screen)
 
 
+class GlyphAtlas:
+    """Split flap characters rendered once for a font and a color, side by side in a sprite sheet.
+
+    All characters are placed in cells of the same width, the largest character advance.
+    Cell height is the line height of the font. Glyphs are drawn anchored left-middle,
+    cell (0, -top) is on the line base point.
+    Characters not in the sheet are rendered on first use.
+    """
+
+    def __init__(self, font, color, characters: list):
+        self.font = font
+        self.color = color
+        self.advance = math.ceil(max([font.getlength(chr(c)) for c in characters]))
+        _, self.top, _, bottom = font.getbbox(" ", anchor="lm")
+        self.height = bottom - self.top
+
+        self.sheet = Image.new(mode="RGBA", size=(self.advance * len(characters), self.height), color=TRANSPARENT_PNG_COLOR)
+        draw = ImageDraw.Draw(self.sheet)
+        self._glyphs = {}
+        for n, c in enumerate(characters):
+            draw.text((n * self.advance, -self.top), text=chr(c), font=font, anchor="lm", fill=color)
+            self._glyphs[chr(c)] = self.sheet.crop((n * self.advance, 0, (n + 1) * self.advance, self.height))
+
+    def glyph(self, c: str) -> Image.Image:
+        image = self._glyphs.get(c)
+        if image is None:
+            image = Image.new(mode="RGBA", size=(self.advance, self.height), color=TRANSPARENT_PNG_COLOR)
+            ImageDraw.Draw(image).text((0, -self.top), text=c, font=self.font, anchor="lm", fill=self.color)
+            self._glyphs[c] = image
+        return image
+
+
+GLYPH_ATLASES = {}  # {(font name, font size, color): GlyphAtlas}, shared by all Solari displays
+_atlas_lock = threading.Lock()
+
+
+def get_glyph_atlas(fontname: str, fontsize: int, font, color) -> GlyphAtlas:
+    key = (fontname, fontsize, str(color))
+    with _atlas_lock:
+        atlas = GLYPH_ATLASES.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(font=font, color=color, characters=CHARACTER_LIST)
+            GLYPH_ATLASES[key] = atlas
+        return atlas
+
+
 class SolariIcon(DrawAnimation):
     """Display up to 2 lines of 3 characters in a split flap/solari animation"""
 
@@ -147,6 +198,16 @@ class SolariIcon(DrawAnimation):
         self.font = self.get_font(self.FONT, self.FONT_SIZE)
         self.base_line = [self.LINE_OFFSET + i * self.LINE_SPACE for i in range(self.NUM_LINES)]
 
+        # Frames are assembled from glyphs of the atlas, only flipped cells are pasted
+        if type(self.color) is list:
+            self.color = tuple(self.color)
+        if type(self.flap_bg_color) is list:
+            self.flap_bg_color = tuple(self.flap_bg_color)
+        self.atlas = get_glyph_atlas(self.FONT, self.FONT_SIZE, self.font, self.flap_bg_color)
+        self._flaps = None  # background with empty flaps
+        self._frame = None  # current frame
+        self._shown = [None for i in range(self.NUM_LINES)]  # text of each line on current frame
+
         self._cached = None  # complete unchanged image
 
         # Text: from last_text to text
@@ -180,74 +241,49 @@ class SolariIcon(DrawAnimation):
         self.solari = [solari(text=self.text[i], last_text=self.last_text[i]) for i in range(self.NUM_LINES)]
         self.completed = [False for text in self.text]
 
-    def animate(self):
+    def make_flaps(self):
         def minbbox(b, s):
             # reduces bbox b by s
             return [b[0] + s, b[1] + s, b[2] - s, b[3] - s]
 
-        image, draw = self.double_icon()
+        self._flaps = self.bg.copy()
+        draw = ImageDraw.Draw(self._flaps)
+        for i in range(self.NUM_LINES):
+            x = self.LINE_OFFSET_X
+            y = self.base_line[i] + self.atlas.top
+            bbox = [x, y, x + self.NUM_CHARS * self.atlas.advance, y + self.atlas.height]
+            draw.rectangle(minbbox(bbox, 5), fill=self.color, width=0)
+        self._frame = self._flaps.copy()
+        self._shown = [None for i in range(self.NUM_LINES)]
+
+    def show_line(self, line: int, text: str):
+        """Pastes glyphs of characters that changed on line"""
+        shown = self._shown[line]
+        y = self.base_line[line] + self.atlas.top
+        for k, c in enumerate(text):
+            if shown is not None and k < len(shown) and shown[k] == c:
+                continue
+            x = self.LINE_OFFSET_X + k * self.atlas.advance
+            box = (x, y, x + self.atlas.advance, y + self.atlas.height)
+            self._frame.paste(self._flaps.crop(box), box[:2])  # blank flap
+            self._frame.alpha_composite(self.atlas.glyph(c), dest=box[:2])
+        self._shown[line] = text
+
+    def animate(self):
+        if self._frame is None:
+            self.make_flaps()
         for i in range(self.NUM_LINES):
             if self.start_delay[i] > 0:
                 self.start_delay[i] = self.start_delay[i] - 1
-                bbox = draw.textbbox(
-                    (self.LINE_OFFSET_X, self.base_line[i]),
-                    text=" " * len(self.text[i]),
-                    font=self.font,
-                    anchor="lm",
-                    align="center",
-                )
-                bbox = minbbox(bbox, 5)
-                draw.rectangle(bbox, fill=self.color, width=0)
-                draw.text(
-                    (self.LINE_OFFSET_X, self.base_line[i]),
-                    text=" " * len(self.text[i]),
-                    font=self.font,
-                    anchor="lm",
-                    align="center",
-                    fill=self.flap_bg_color,
-                )
+                self.show_line(i, " " * len(self.text[i]))
                 continue
             try:
-                text = next(self.solari[i])
-                bbox = draw.textbbox(
-                    (self.LINE_OFFSET_X, self.base_line[i]),
-                    text=text,
-                    font=self.font,
-                    anchor="lm",
-                    align="center",
-                )
-                bbox = minbbox(bbox, 5)
-                draw.rectangle(bbox, fill=self.color, width=0)
-                draw.text(
-                    (self.LINE_OFFSET_X, self.base_line[i]),
-                    text=text,
-                    font=self.font,
-                    anchor="lm",
-                    align="center",
-                    fill=self.flap_bg_color,
-                )
+                self.show_line(i, next(self.solari[i]))
             except StopIteration:
-                bbox = draw.textbbox(
-                    (self.LINE_OFFSET_X, self.base_line[i]),
-                    text=self.text[i],
-                    font=self.font,
-                    anchor="lm",
-                    align="center",
-                )
-                bbox = minbbox(bbox, 5)
-                draw.rectangle(bbox, fill=self.color, width=0)
-                draw.text(
-                    (self.LINE_OFFSET_X, self.base_line[i]),
-                    text=self.text[i],
-                    font=self.font,
-                    anchor="lm",
-                    align="center",
-                    fill=self.flap_bg_color,
-                )
+                self.show_line(i, self.text[i])
                 self.last_text[i] = self.text[i]
                 self.completed[i] = True
-        self._cached = self.bg.copy()
-        self._cached.alpha_composite(image)
+        self._cached = self._frame.copy()
 
     def get_image_for_icon(self):
         """
@@ -147,6 +147,8 @@ class CircularSwitch(SwitchBase):
 
     REPRESENTATION_NAME = "circular-switch"
 
+    IMAGE_CACHE = True
+
     PARAMETERS = SwitchBase.PARAMETERS | PARAM_BTN_CIRCULAR_SWITCH
 
     def __init__(self, button: "Button"):
@@ -447,6 +449,8 @@ class Switch(SwitchBase):
 
     REPRESENTATION_NAME = "switch"
 
+    IMAGE_CACHE = True
+
     PARAMETERS = SwitchBase.PARAMETERS | PARAM_BTN_SWITCH
 
     def __init__(self, button: "Button"):
@@ -1034,6 +1038,8 @@ class PushSwitch(SwitchBase):
 
     REPRESENTATION_NAME = "push-switch"
 
+    IMAGE_CACHE = True
+
     PARAMETERS = SwitchBase.PARAMETERS | PARAM_BTN_PUSH
 
     def __init__(self, button: "Button"):
@@ -1056,6 +1062,9 @@ class PushSwitch(SwitchBase):
         self.handle_off_stroke_color = convert_color(self.handle_off_stroke_color)
         self.handle_off_stroke_width = self.get_attribute("witness-stroke-off-width", 4)
 
+    def get_image_cache_inputs(self) -> tuple:
+        return (hasattr(self.button._activation, "is_off") and self.button._activation.is_off(),)
+
     def get_image_for_icon(self):
         """
         Helper function to get button image and overlay label on top of it.
@@ -8,12 +8,10 @@ import io
 import glob
 import base64
 import threading
-import pickle
 import json
 import itertools
 import re
 
-from queue import Queue
 from typing import Dict, Tuple, Set
 from datetime import datetime
 
@@ -24,10 +22,6 @@ import pkgutil
 from cockpitdecks.buttons import representation
 from packaging.requirements import Requirement
 
-from PIL import Image, ImageFont
-
-from cairosvg import svg2png
-
 from usbmonitor import USBMonitor
 from usbmonitor.attributes import ID_SERIAL
 
@@ -78,8 +72,15 @@ from cockpitdecks import (
 from cockpitdecks.constant import TYPES_FOLDER
 from cockpitdecks.resources.color import convert_color, has_ext, add_ext
 from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
+from cockpitdecks.resources.fontcache import FONTS
+from cockpitdecks.resources.registry import ResourceRegistry, load_image, load_bytes
+from cockpitdecks.resources.iconcache import IconCache
+from cockpitdecks.resources.startupprofile import STARTUP_PROFILE
+from cockpitdecks.resources.imagecache import RENDERED_IMAGES
 from cockpitdecks.variable import Variable, VariableFactory, InternalVariable, VariableDatabase, InternalVariableType, VariableListener
 from cockpitdecks.activity import ActivityDatabase, Activity, ActivityFactory
+from cockpitdecks.event import EventQueue
+from cockpitdecks.scheduler import AnimationClock
 from cockpitdecks.simulator import Simulator, SimulatorEvent, NoSimulator
 from cockpitdecks.instruction import Instruction, InstructionFactory, InstructionPerformer
 from cockpitdecks.observable import Observables, Observable
@@ -90,6 +91,8 @@ import cockpitdecks.decks
 
 from cockpitdecks.deck import Deck
 from cockpitdecks.decks.resources import DeckType
+from cockpitdecks.decks.resources.wsframe import ImageEncoder, accepted_format, encode_image, image_frame, image_payload
+from cockpitdecks.decks.resources.wsclient import WebDeckClient, AsyncWebDeckClient
 from cockpitdecks.buttons.activation import Activation
 from cockpitdecks.buttons.representation import Representation, HardwareRepresentation
 from cockpitdecks.aircraft import Aircraft
@@ -117,6 +120,9 @@ if EVENTLOGFILE is not None:
     event_logger.addHandler(handler)
     event_logger.propagate = False
 LOG_SIMULATOR_VARIABLE_EVENTS = False  # Do not log dataref events (numerous, can grow quite large, especialy for long sessions)
+EVENT_STATS_INTERVAL = 1.0  # seconds, event queue statistics are published as internal variables at that interval
+WEB_DECK_HEARTBEAT = 10.0  # seconds, web deck clients are probed at that interval, failing clients are removed
+PAGE_WATCH_INTERVAL = 1.0  # seconds, page files are checked for changes at that interval when watch-pages is set
 #
 # ################################################
 
@@ -570,9 +576,15 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
         self._device_scanned = False
 
         # Virtual/Web devices
-        self.vd_ws_conn = {}
+        self.vd_ws_conn = {}  # deck name: [WebDeckClient]
+        self.vd_ws_lock = threading.RLock()  # clients register and close from websocket handlers and sender threads
+        self.heartbeat_thread = None
+        self.heartbeat_exit = threading.Event()
         self.vd_errs = []
 
+        # Single clock for all animations and periodic activities, started on first registration
+        self.animation_clock = AnimationClock()
+
         # Global parameters that affect colors and deck LCD backlight
         self.global_luminosity = 1.0
         self.global_brightness = 1.0
@@ -580,8 +592,9 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
         # Content (global, cockpit level)
         # Cockpit is permanent | Aircraft are changing
         self._fonts = {}
-        self._sounds = {}
-        self._icons = {}
+        self._sounds = ResourceRegistry(loader=load_bytes)
+        self._icons = ResourceRegistry(loader=load_image)
+        self._icon_cache: IconCache | None = None
         self._observables: Observables | None = None  # loaded from file
 
         self._permanent_observables = {}  # Subclasses of Observables, static, fixed after extension load
@@ -606,7 +619,9 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
         # Main event look
         self.event_loop_run = False
         self.event_loop_thread = None
-        self.event_queue = Queue()
+        self.event_queue = EventQueue()
+        self._event_delays = {}  # event class name: [count, total delay, max delay] since last published
+        self._event_stats_ts = 0
 
         # Simulator
         self._simulator_name = environ.get(ENVIRON_KW.SIMULATOR_NAME.value)
@@ -622,6 +637,9 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
 
         self.default_pages = None  # current pages on decks when reloading
         self.client_list = None
+        self.page_watcher = None  # timer checking page files
+        self._watched_layouts = {}  # {layout folder: [deck names]}
+        self._page_files = {}  # {page file: modification time}
         self.mode = 0  # CD_MODE: NORMAL = 0 (normal operation), DEMO = 1 (no aircraft, do not change aircraft), FIXED = 2 (do not change aircraft)
 
         self.activate_designer = False
@@ -1307,12 +1325,16 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
     # Cockpit data caches
     #
     def load_resources(self):
-        self.load_icons()
-        self.load_sounds()
-        self.load_fonts()
+        with STARTUP_PROFILE.phase("Cockpit.load_icons"):
+            self.load_icons()
+        with STARTUP_PROFILE.phase("Cockpit.load_sounds"):
+            self.load_sounds()
+        with STARTUP_PROFILE.phase("Cockpit.load_fonts"):
+            self.load_fonts()
         self.load_defaults()
         self.load_observables()
-        self.load_deck_types()
+        with STARTUP_PROFILE.phase("Cockpit.load_deck_types"):
+            self.load_deck_types()
 
     def load_deck_types(self):
         # 1. "System" types
@@ -1408,42 +1430,33 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
 
     def load_icons(self):
         # Loading default icons
+        # Icons are indexed by name, they are loaded on first use.
         #
         cache_icon = self.get_attribute("cache-icon")
         dn = os.path.join(os.path.dirname(__file__), RESOURCES_FOLDER, ICONS_FOLDER)
         if os.path.exists(dn):
-            cache = os.path.join(dn, "_icon_cache.pickle")
-            if os.path.exists(cache) and cache_icon:
-                with open(cache, "rb") as fp:
-                    self._icons = pickle.load(fp)
-                logger.info(f"{len(self._icons)} icons loaded from cache")
-            else:
-                icons = os.listdir(dn)
-                for i in icons:
-                    fn = os.path.join(dn, i)
-                    if has_ext(i, "png"):  # later, might load JPG as well.
-                        image = Image.open(fn)
-                        self._icons[i] = image
-                    elif has_ext(i, "svg"):  # Wow.
-                        try:
-                            fn = os.path.join(dn, i)
-                            fout = fn.replace(".svg", ".png")
-                            svg2png(url=fn, write_to=fout)
-                            image = Image.open(fout)
-                            self._icons[i] = image
-                        except:
-                            logger.warning(f"could not load icon {fn}")
-                            pass  # no cairosvg
-
-                if cache_icon:  # we cache both folders of icons
-                    with open(cache, "wb") as fp:
-                        pickle.dump(self._icons, fp)
-                    logger.info(f"{len(self._icons)} icons cached")
-                else:
-                    logger.info(f"{len(self._icons)} icons loaded")
+            loader = None
+            if cache_icon:  # decoded icons are kept in a cache file, only changed icons are decoded again
+                self._icon_cache = IconCache(dn)
+                loader = self._icon_cache.get
+            icons = os.listdir(dn)
+            for i in icons:
+                fn = os.path.join(dn, i)
+                if has_ext(i, "png"):  # later, might load JPG as well.
+                    self._icons.register(i, fn, loader=loader)
+                elif has_ext(i, "svg"):  # converted to PNG in memory on first use
+                    self._icons.register(i, fn, loader=loader)
+                    png = i.replace(".svg", ".png")
+                    if png not in icons:
+                        self._icons.register(png, fn, loader=loader)
+            logger.info(f"{len(self._icons)} icons indexed{', cached' if cache_icon else ''}")
 
         self.icons = self._icons | self.aircraft.icons
 
+    def save_icon_cache(self):
+        if self._icon_cache is not None:
+            self._icon_cache.save()
+
     def load_fonts(self):
         # Loading fonts.
         # For custom fonts (fonts found in the fonts config folder),
@@ -1459,10 +1472,9 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
                 if has_ext(i, ".ttf") or has_ext(i, ".otf"):
                     if i not in self._fonts.keys():
                         fn = os.path.join(rn, i)
-                        try:
-                            test = ImageFont.truetype(fn, self.get_attribute("label-size", 12))
+                        if FONTS.exists(fn):  # font will be loaded on first use
                             self._fonts[i] = fn
-                        except:
+                        else:
                             logger.warning(f"font file {fn} not loaded")
                     else:
                         logger.debug(f"font {i} already loaded")
@@ -1482,16 +1494,12 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
                 if has_ext(i, ".wav") or has_ext(i, ".mp3"):
                     if i not in self._sounds.keys():
                         fn = os.path.join(rn, i)
-                        try:
-                            with open(fn, mode="rb") as file:  # b is important -> binary
-                                self._sounds[i] = file.read()
-                        except:
-                            logger.warning(f"default sound file {fn} not loaded")
+                        self._sounds.register(i, fn)  # sound will be loaded on first use
                     else:
                         logger.debug(f"sound {i} already loaded")
 
         self.sounds = self._sounds | self.aircraft.sounds
-        logger.info(f"{len(self._sounds)} sounds loaded")
+        logger.info(f"{len(self._sounds)} sounds indexed")
 
     def load_defaults(self):
         """
@@ -1504,32 +1512,24 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
                 return fontname
 
             # 1. Try "system" font
-            try:
-                test = ImageFont.truetype(fontname, self.get_attribute("label-size", 12))
+            if FONTS.get(fontname, self.get_attribute("label-size", 12)) is not None:
                 logger.debug(f"font {fontname} found in computer system fonts")
                 return fontname
-            except:
-                logger.debug(f"font {fontname} not found in computer system fonts")
+            logger.debug(f"font {fontname} not found in computer system fonts")
 
             # 2. Try font in resources folder
-            fn = None
-            try:
-                fn = os.path.join(os.path.dirname(__file__), RESOURCES_FOLDER, fontname)
-                test = ImageFont.truetype(fn, self.get_attribute("label-size", 12))
+            fn = os.path.join(os.path.dirname(__file__), RESOURCES_FOLDER, fontname)
+            if FONTS.exists(fn):
                 logger.debug(f"font {fontname} found locally ({RESOURCES_FOLDER} folder)")
                 return fn
-            except:
-                logger.debug(f"font {fontname} not found locally ({RESOURCES_FOLDER} folder)")
+            logger.debug(f"font {fontname} not found locally ({RESOURCES_FOLDER} folder)")
 
             # 3. Try font in resources/fonts folder
-            fn = None
-            try:
-                fn = os.path.join(os.path.dirname(__file__), RESOURCES_FOLDER, FONTS_FOLDER, fontname)
-                test = ImageFont.truetype(fn, self.get_attribute("label-size", 12))
+            fn = os.path.join(os.path.dirname(__file__), RESOURCES_FOLDER, FONTS_FOLDER, fontname)
+            if FONTS.exists(fn):
                 logger.debug(f"font {fontname} found locally ({FONTS_FOLDER} folder)")
                 return fn
-            except:
-                logger.debug(f"font {fontname} not found locally ({FONTS_FOLDER} folder)")
+            logger.debug(f"font {fontname} not found locally ({FONTS_FOLDER} folder)")
 
             logger.debug(f"font {fontname} not found")
             return None
@@ -1694,6 +1694,7 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
         self.mode = mode
         with self.reload_operation:
             self.aircraft.start(acpath)
+            self.save_icon_cache()
         # self.add_aircraft_resources() called in above
         self.run(release)
 
@@ -1934,6 +1935,75 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
             self.event_queue.put(f"reload:{deck_name}")
             logger.info("enqueued")
 
+    def reload_page_file(self, deck_name: str, filename: str, just_do_it: bool = False):
+        """
+        Reloads a changed page file of one deck, only buttons that changed are rebuilt.
+        If the change cannot be applied to the loaded page, the whole deck is reloaded.
+        """
+        if just_do_it:
+            deck = self.decks.get(deck_name)
+            if deck is None:
+                logger.info(f"deck {deck_name} not found")
+                return
+            if not deck.reload_page_file(filename):
+                logger.info(f"deck {deck_name}: {os.path.basename(filename)} cannot be reloaded incrementally, reloading deck")
+                self.reload_deck(deck_name, just_do_it=True)
+        else:
+            self.event_queue.put(f"reload-page:{deck_name}:{filename}")
+            logger.debug("enqueued")
+
+    @staticmethod
+    def get_page_files(folder: str) -> dict:
+        """Returns page files in layout folder with their modification time"""
+        files = {}
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return files
+        for name in names:
+            if has_ext(name, "yaml") or has_ext(name, "yml") or has_ext(name, DESIGNER_EXTENSION):
+                fn = os.path.join(folder, name)
+                try:
+                    files[fn] = os.stat(fn).st_mtime_ns
+                except OSError:
+                    continue
+        return files
+
+    def watch_page_files(self):
+        """
+        Watches layout folders of decks if watch-pages is set.
+        Changed page files are reloaded incrementally, without reloading decks.
+        """
+        self._watched_layouts = {}
+        self._page_files = {}
+        if not self.get_attribute("watch-pages") or self.aircraft.acpath is None:
+            return
+        for deck in self.decks.values():
+            if deck.layout is None:
+                continue
+            dn = os.path.abspath(os.path.join(self.aircraft.acpath, CONFIG_FOLDER, deck.layout))
+            self._watched_layouts.setdefault(dn, []).append(deck.name)
+        for dn in self._watched_layouts:
+            self._page_files.update(Cockpit.get_page_files(dn))
+        if self.page_watcher is None:
+            self.page_watcher = self.animation_clock.register(interval=PAGE_WATCH_INTERVAL, callback=self.check_page_files, name="page watcher")
+        logger.info(f"watching {len(self._page_files)} page files in {len(self._watched_layouts)} layouts")
+
+    def check_page_files(self):
+        # Called by animation clock, reloads are performed in event loop
+        for dn, decks in list(self._watched_layouts.items()):
+            files = Cockpit.get_page_files(dn)
+            before = {fn: mtime for fn, mtime in self._page_files.items() if os.path.dirname(fn) == dn}
+            for fn in set(files) | set(before):  # changed, added or removed files
+                if files.get(fn) != before.get(fn):
+                    logger.debug(f"page file {fn} changed")
+                    for deck in decks:
+                        self.reload_page_file(deck_name=deck, filename=fn)
+                    if fn in files:
+                        self._page_files[fn] = files[fn]
+                    else:
+                        del self._page_files[fn]
+
     def reload_decks(self, just_do_it: bool = False):
         """
         Development function to reload page yaml without leaving the page
@@ -2006,6 +2076,9 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
                 elif e.startswith("reload:"):
                     deck = e.replace("reload:", "")
                     self.reload_deck(deck, just_do_it=True)
+                elif e.startswith("reload-page:"):
+                    _, deck, filename = e.split(":", 2)
+                    self.reload_page_file(deck, filename, just_do_it=True)
                 elif e == "stop":
                     self.stop_decks(just_do_it=True)
                 self.inc("event_count_" + e)
@@ -2022,8 +2095,48 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
             except:
                 logger.warning("..done with error", exc_info=True)
 
+            self.event_stats(e)
+
         logger.debug(".. event loop ended")
 
+    def event_stats(self, event):
+        """Collects event wait time per event class and periodically publishes
+        event queue, rendered image cache, animation clock and web deck client statistics as internal variables."""
+        delay = event.delay
+        if delay < 0:  # event did not mark handling start
+            delay = datetime.now().timestamp() - event.timestamp
+        stat = self._event_delays.setdefault(type(event).__name__, [0, 0.0, 0.0])
+        stat[0] = stat[0] + 1
+        stat[1] = stat[1] + delay
+        stat[2] = max(stat[2], delay)
+
+        ts = datetime.now().timestamp()
+        if ts - self._event_stats_ts < EVENT_STATS_INTERVAL or self.sim is None:
+            return
+        self._event_stats_ts = ts
+        queue_stats = self.event_queue.stats()
+        image_stats = RENDERED_IMAGES.stats()
+        clock_stats = self.animation_clock.stats()
+        for name, value in [
+            (COCKPITDECKS_INTVAR.EVENT_QUEUE_DEPTH.value, self.event_queue.qsize()),
+            (COCKPITDECKS_INTVAR.EVENT_QUEUE_PRIORITY_DEPTH.value, queue_stats["priority"]),
+            (COCKPITDECKS_INTVAR.EVENT_COALESCED.value, queue_stats["coalesced"]),
+            (COCKPITDECKS_INTVAR.EVENT_DROPPED.value, queue_stats["dropped"]),
+            (COCKPITDECKS_INTVAR.IMAGE_CACHE_HITS.value, image_stats["hits"]),
+            (COCKPITDECKS_INTVAR.IMAGE_CACHE_MISSES.value, image_stats["misses"]),
+            (COCKPITDECKS_INTVAR.IMAGE_CACHE_EVICTIONS.value, image_stats["evictions"]),
+            (COCKPITDECKS_INTVAR.IMAGE_CACHE_SIZE.value, image_stats["bytes"]),
+            (COCKPITDECKS_INTVAR.ANIMATION_TIMERS.value, clock_stats["timers"]),
+            (COCKPITDECKS_INTVAR.ANIMATION_LATE.value, clock_stats["late"]),
+        ]:
+            self.sim.set_internal_variable(name=ID_SEP.join([self.get_id(), name]), value=value, cascade=True)
+        for evtype, stat in self._event_delays.items():
+            prefix = ID_SEP.join([self.get_id(), COCKPITDECKS_INTVAR.EVENT_DELAY.value, evtype])
+            self.sim.set_internal_variable(name=prefix, value=round(1000 * stat[1] / stat[0], 3), cascade=True)  # ms
+            self.sim.set_internal_variable(name=ID_SEP.join([prefix, "max"]), value=round(1000 * stat[2], 3), cascade=True)
+        self._event_delays = {}
+        self.web_client_stats()
+
     def stop_event_loop(self):
         if self.event_loop_run:
             self.event_loop_run = False
@@ -2122,6 +2235,8 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
         self.start_event_loop()
         logger.info("..event loop started..")
         if self.has_web_decks():
+            self.start_heartbeat()
+            logger.info("..web deck heartbeat started..")
             self.handle_code(code=4, name="init")  # wake up proxy
         logger.info(f"{len(threading.enumerate())} threads")
         logger.info(f"{[t.name for t in threading.enumerate()]}")
@@ -2151,6 +2266,7 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
 
             self.aircraft.terminate()
             logger.info("..aircraft terminated..")
+            self.save_icon_cache()
 
             nt = threading.enumerate()
             if len(nt) > 1:
@@ -2164,12 +2280,16 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
         if self.event_loop_run:
             self.stop_event_loop()
             logger.info("..event loop stopped..")
+        self.stop_heartbeat()
         #
         self.variable_database.dump()
         logger.info("..variables dumped..")
         # Terminate decks
         self.aircraft.terminate()
         logger.info("..aircraft terminated..")
+        self.save_icon_cache()
+        self.animation_clock.stop()
+        logger.info("..animation clock stopped..")
         # Terminate dataref collection
         if self.sim is not None:
             logger.info("..terminating connection to simulator..")
@@ -2251,6 +2371,15 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
             return
         deck.replay(key=key, state=event, data=data)
 
+    def handle_web_event(self, data: dict):
+        """Processes an event (code 0) or replay event (code 99) received from a web deck"""
+        code = data.get("code")
+        deck = data.get("deck")
+        if deck is None:  # sim event
+            self.replay_sim_event(data=data)
+        else:
+            self.process_event(deck_name=deck, key=data.get("key"), event=data.get("event"), data=data.get("data"), replay=code == 99)
+
     def replay_sim_event(self, data: dict):
         path = data.get("path")
         if path is not None:
@@ -2264,57 +2393,123 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
     def clear_virtual_deck_errors(self):
         self.vd_errs = []
 
-    def register_deck(self, deck: str, websocket):
-        if deck not in self.vd_ws_conn:
-            self.vd_ws_conn[deck] = []
-            logger.debug(f"{deck}: new registration")
-        self.vd_ws_conn[deck].append(websocket)
-        logger.debug(f"{deck}: registration added ({len(self.vd_ws_conn[deck])})")
-        logger.info(f"registered deck {deck}")
+    def register_deck(self, deck: str, websocket, formats: list | None = None, loop=None):
+        """Registers a new web deck client. When loop is supplied, websocket is asynchronous and
+        messages are sent from a task on that event loop rather than from a thread."""
+        with self.vd_ws_lock:
+            if deck not in self.vd_ws_conn:
+                self.vd_ws_conn[deck] = []
+                logger.debug(f"{deck}: new registration")
+            if loop is not None:
+                client = AsyncWebDeckClient(deck=deck, ws=websocket, loop=loop, image_format=accepted_format(formats), on_close=self.client_closed)
+            else:
+                client = WebDeckClient(deck=deck, ws=websocket, image_format=accepted_format(formats), on_close=self.client_closed)
+            client.start()
+            self.vd_ws_conn[deck].append(client)
+            logger.debug(f"{deck}: registration added ({len(self.vd_ws_conn[deck])})")
+            logger.info(f"registered deck {deck} (images sent as {client.image_format or 'json'})")
+
+    def is_deck_connected(self, deck) -> bool:
+        """Returns whether web deck has at least one open client, from connection state, without network access."""
+        client_list = self.vd_ws_conn.get(deck)
+        return client_list is not None and any(not client.closed for client in client_list)
 
-    def is_closed(self, ws):
-        return ws.__dict__.get("environ").get("werkzeug.socket").fileno() < 0  # there must be a better way to do this...
+    def client_closed(self, client):
+        self.remove_client(client.ws)
 
     def remove_client(self, websocket):
         # we unfortunately have to scan all decks to find the ws to remove
         #
-        for deck in self.vd_ws_conn:
+        with self.vd_ws_lock:
+            for deck in self.vd_ws_conn:
+                remove = []
+                for client in self.vd_ws_conn[deck]:
+                    if client.ws == websocket:
+                        remove.append(client)
+                for client in remove:
+                    client.stop()
+                    self.vd_ws_conn[deck].remove(client)
             remove = []
-            for ws in self.vd_ws_conn[deck]:
-                if ws == websocket:
-                    remove.append(websocket)
-            for ws in remove:
-                self.vd_ws_conn[deck].remove(ws)
-        remove = []
-        for deck in self.vd_ws_conn:
-            if len(self.vd_ws_conn[deck]) == 0:
-                self.handle_code(code=2, name=deck)
-                remove.append(deck)
-                logger.info(f"unregistered deck {deck}")
-        for deck in remove:
-            del self.vd_ws_conn[deck]
-
-    def send(self, deck, payload) -> bool:
+            for deck in self.vd_ws_conn:
+                if len(self.vd_ws_conn[deck]) == 0:
+                    self.handle_code(code=2, name=deck)
+                    remove.append(deck)
+                    logger.info(f"unregistered deck {deck}")
+            for deck in remove:
+                del self.vd_ws_conn[deck]
+
+    def _enqueue(self, deck, message, coalesce_key=None) -> bool:
+        """Queues message for each client of deck.
+        Message is either already serialized (str or bytes), or a function that returns the serialized message for a client.
+        """
         sent = False
         client_list = self.vd_ws_conn.get(deck)
-        closed_ws = []
+        closed = []
         if client_list is not None:
-            for ws in client_list:  # send to each instance of this deck connected to this websocket server
-                if self.is_closed(ws):
-                    closed_ws.append(ws)
+            for client in list(client_list):  # send to each instance of this deck connected to this websocket server
+                if client.closed:
+                    closed.append(client)
                     continue
-                ws.send(json.dumps(payload))
-                logger.debug(f"sent for {deck}")
+                client.enqueue(message(client) if callable(message) else message, coalesce_key=coalesce_key)
+                logger.debug(f"queued for {client.name}")
                 sent = True
-            if len(closed_ws) > 0:
-                for ws in closed_ws:
-                    client_list.remove(ws)
+            if len(closed) > 0:
+                for client in closed:
+                    client.stop()
+                    if client in client_list:
+                        client_list.remove(client)
         else:
             if deck not in self.vd_errs:
                 logger.debug(f"no client for {deck}")  # warning
                 self.vd_errs.append(deck)
         return sent
 
+    def send(self, deck, payload, coalesce_key=None) -> bool:
+        return self._enqueue(deck=deck, message=json.dumps(payload), coalesce_key=coalesce_key)  # serialized once for all clients
+
+    def send_image(self, deck, key, image, meta: dict, code: int = 0, encoder: ImageEncoder | None = None) -> bool:
+        """Sends image to each web deck client, in binary frame or JSON payload as requested by client.
+        Image is encoded and serialized once per format, whatever the number of clients.
+        Encoder supplies the encoding options of the deck, default options are used if None.
+        An image waiting to be sent to a client is replaced by a newer image of the same key."""
+        messages = {}
+        encode = encoder.encode if encoder is not None else encode_image
+
+        def message(client):
+            fmt = client.image_format
+            if fmt not in messages:
+                if fmt is None:
+                    content = encode(image, "png")
+                    messages[fmt] = json.dumps(image_payload(code=code, deck=deck, key=key, content=content, meta=meta))
+                else:
+                    content = encode(image, fmt)
+                    messages[fmt] = image_frame(code=code, deck=deck, key=key, fmt=fmt, content=content)
+            return messages[fmt]
+
+        return self._enqueue(deck=deck, message=message, coalesce_key=(code, key))
+
+    def web_client_stats(self):
+        """Publishes backlog and send latency of web deck clients as internal variables, per deck.
+
+        Statistics are published per deck rather than per client, since client identifiers change on each reconnection.
+        Counts are summed over open clients, backlog and latency are those of the worst client.
+        """
+        for deck, client_list in list(self.vd_ws_conn.items()):
+            stats = [client.stats() for client in list(client_list)]
+            if len(stats) == 0:
+                continue
+            prefix = ID_SEP.join([self.get_id(), COCKPITDECKS_INTVAR.WEB_CLIENT.value, deck])
+            for name, value in [
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_BACKLOG.value, max([s["backlog"] for s in stats])),
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_MAX_BACKLOG.value, max([s["max_backlog"] for s in stats])),
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_SENT.value, sum([s["sent"] for s in stats])),
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_COALESCED.value, sum([s["coalesced"] for s in stats])),
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_DROPPED.value, sum([s["dropped"] for s in stats])),
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_LATENCY.value, round(1000 * max([s["latency"] for s in stats]), 3)),  # ms
+                (COCKPITDECKS_INTVAR.WEB_CLIENT_LATENCY_MAX.value, round(1000 * max([s["latency_max"] for s in stats]), 3)),
+            ]:
+                self.sim.set_internal_variable(name=ID_SEP.join([prefix, name]), value=value, cascade=True)
+
     def probe(self, deck):
         return self.send(
             deck=deck,
@@ -2323,8 +2518,31 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
                 "deck": deck,
                 "meta": {"ts": datetime.now().timestamp()},
             },
+            coalesce_key=("probe",),  # only one probe waiting per client, tuple never collides with integer keys of other messages
         )
 
+    def start_heartbeat(self):
+        if self.heartbeat_thread is None:
+            self.heartbeat_exit.clear()
+            self.heartbeat_thread = threading.Thread(target=self.heartbeat, name="Cockpit::Web Deck Heartbeat", daemon=True)
+            self.heartbeat_thread.start()
+            logger.debug("heartbeat started")
+        else:
+            logger.warning("heartbeat already running")
+
+    def heartbeat(self):
+        # Probes all web deck clients at regular interval.
+        # Clients that fail to receive the probe are closed and removed.
+        while not self.heartbeat_exit.wait(WEB_DECK_HEARTBEAT):
+            for deck in list(self.vd_ws_conn.keys()):
+                self.probe(deck)
+
+    def stop_heartbeat(self):
+        if self.heartbeat_thread is not None:
+            self.heartbeat_exit.set()
+            self.heartbeat_thread = None
+            logger.debug("heartbeat stopped")
+
     def refresh_deck(self, deck):
         payload = {"code": 1, "deck": deck, "meta": {"ts": datetime.now().timestamp()}}
         self.send(deck=deck, payload=payload)
@@ -2629,7 +2847,7 @@ class Cockpit(VariableListener, InstructionFactory, InstructionPerformer, Cockpi
             with open(fn, "w") as fp:
                 yaml.dump(page_config, fp)
                 logger.info(f"button saved (in {fn}, original preserved)")
-            self.reload_deck(deck_name=deck)
+            self.reload_page_file(deck_name=deck, filename=fn)
         else:
             logger.info(f"button not saved, cannot overwrite original {orig}")
 
@@ -25,6 +25,7 @@ from ruamel.yaml import YAML
 ROOT_DEBUG = ""
 EXCLUDE_DECKS: List[str] = []  # list serial numbers of deck not usable by Streadecks
 DEFAULT_FREQUENCY = 3
+DEFAULT_MAX_FPS = 30  # max number of renders per second of a button on a deck, 0 renders immediately, without scheduling
 
 # File & folder names
 ENVIRON_FILE = "environ.yaml"
@@ -240,9 +241,11 @@ class DECK_KW(Enum):
     HARDWARE_REPRESENTATION = "hardware"
     IMAGE = "image"
     IMAGE_ALTERNATE = "alternate"
+    IMAGE_ENCODER = "image-encoder"
     INDEX = "index"
     INT_NAME = "_intname"
     LAYOUT = "layout"
+    MAX_FPS = "max-fps"
     MOSAIC = "mosaic"
     NAME = "name"
     NONE = "none"
@@ -291,6 +294,7 @@ class ANNUNCIATOR_STYLES(Enum):
 
 COCKPITDECKS_DEFAULT_VALUES = {
     "cache-icon": True,
+    "watch-pages": False,
     "system-font": "Monaco.ttf",  # alias
     "cockpit-color": "cornflowerblue",  # there are no default-* for the following three values, just cockpit-* values
     "cockpit-texture": None,  # in other words, cockpit-* values ARE cockpitdecks-level, global default values.
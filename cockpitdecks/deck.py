@@ -9,7 +9,7 @@ from abc import ABC, abstractmethod
 from PIL import Image
 
 from cockpitdecks import CONFIG_FOLDER, CONFIG_FILE, RESOURCES_FOLDER, ICONS_FOLDER
-from cockpitdecks import Config, ID_SEP, CONFIG_KW, DEFAULT_LAYOUT, DEFAULT_ATTRIBUTE_PREFIX, DESIGNER_EXTENSION
+from cockpitdecks import Config, ID_SEP, CONFIG_KW, DEFAULT_LAYOUT, DEFAULT_ATTRIBUTE_PREFIX, DESIGNER_EXTENSION, DECK_KW, DEFAULT_MAX_FPS
 from cockpitdecks.decks.resources.decktype import ButtonType
 from cockpitdecks.resources.color import convert_color
 
@@ -17,12 +17,18 @@ from cockpitdecks.decks.resources import DeckType
 from cockpitdecks.buttons.representation import IconBase
 from cockpitdecks.event import PushEvent, EncoderEvent
 from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
+from cockpitdecks.resources.imagecache import ImageCache
+from cockpitdecks.resources.startupprofile import STARTUP_PROFILE
+from cockpitdecks.resources.configcache import PAGE_CONFIGS
+from cockpitdecks.scheduler import RenderScheduler
 from .page import Page
 from .button import Button
 
 logger = logging.getLogger(__name__)
 # logger.setLevel(logging.DEBUG)
 
+BACKGROUND_CACHE_MAX_ENTRIES = 64  # per deck, distinct (size, texture or color) button backgrounds
+
 
 class Deck(ABC):
     """
@@ -55,6 +61,8 @@ class Deck(ABC):
         self.valid = False
         self.running = False
 
+        self.render_scheduler: RenderScheduler | None = None
+
         # Layout
         self.layout = config.get(CONFIG_KW.LAYOUT.value, DEFAULT_LAYOUT)
         self._layout_config: Dict[str, str | int | float | bool | Dict] = {}  # content of aircraft/deckconfig/layout/config.yaml
@@ -90,7 +98,9 @@ class Deck(ABC):
             return
         self.set_deck_type()
         self.set_brightness(self.brightness)
-        self.load()  # will load default page if no page found
+        self.start_render_scheduler()
+        with STARTUP_PROFILE.phase("Deck.load"):
+            self.load()  # will load default page if no page found
         self.start()  # Some system may need to start before we can load a page
 
     def get_id(self) -> str:
@@ -126,6 +136,26 @@ class Deck(ABC):
         if self.deck_type is None:
             logger.error(f"no deck definition for {deck_type}")
 
+    def start_render_scheduler(self):
+        """Installs and starts the render scheduler if the deck renders at a limited frame rate.
+
+        Max frame rate comes from the deck configuration, the deck type, or the default value.
+        A max frame rate of 0 renders buttons immediately.
+        """
+        max_fps = self._config.get(DECK_KW.MAX_FPS.value)
+        if max_fps is None and self.deck_type is not None:
+            max_fps = self.deck_type.max_fps
+        if max_fps is None:
+            max_fps = DEFAULT_MAX_FPS
+        if self.render_scheduler is not None:
+            self.render_scheduler.stop()
+            self.render_scheduler = None
+        if max_fps <= 0:
+            logger.debug(f"deck {self.name}: no render scheduler")
+            return
+        self.render_scheduler = RenderScheduler(deck=self, max_fps=max_fps)
+        self.render_scheduler.start()
+
     def get_attribute(self, attribute: str, default=None, propagate: bool = True, silence: bool = True) -> Any or None:
         """Returns the default attribute value
 
@@ -250,7 +280,7 @@ class Deck(ABC):
 
         pages = os.listdir(dn)
         if CONFIG_FILE in pages:  # first load config
-            self._layout_config = Config(os.path.join(dn, CONFIG_FILE))
+            self._layout_config = PAGE_CONFIGS.get(os.path.join(dn, CONFIG_FILE))
             if not self._layout_config.is_valid():
                 logger.debug("no layout config file")
             else:  # get new value if it exists
@@ -278,7 +308,7 @@ class Deck(ABC):
                 page_config = Config(fn2)
 
             if page_config is None:
-                page_config = Config(fn)
+                page_config = PAGE_CONFIGS.get(fn)  # parsed again only if file changed
 
             if not page_config.is_valid():
                 logger.warning(f"file {p} not found or invalid")
@@ -331,7 +361,7 @@ class Deck(ABC):
                     if not os.path.exists(fni):
                         logger.warning(f"includes: {inc}: file {os.path.join(dn, inc + '.{yaml|yml|txt}')} not found")
                         continue
-                    inc_config = Config(fni)
+                    inc_config = PAGE_CONFIGS.get(fni)
                     if inc_config.is_valid():
                         this_page.merge_attributes(inc_config.store)  # merges attributes first since can have things for buttons....
                         if CONFIG_KW.BUTTONS.value in inc_config:
@@ -352,6 +382,8 @@ class Deck(ABC):
             if verbose:
                 logger.info(f"deck {self.name}: page {page_name} loaded (from file {display_fn}), contains {len(this_page.buttons)} buttons")
 
+        PAGE_CONFIGS.save(dn)
+
         if not len(self.pages) > 0:
             self.valid = False
             logger.error(f"{self.name}: has no page, ignoring")
@@ -404,7 +436,11 @@ class Deck(ABC):
                 simulator_variables=self.current_page.simulator_variables, reason=f"deck {self.name}, page {self.current_page.name}"
             )  # set simulator variables to monitor
             logger.debug("..rendering page..")
-            self.current_page.render()
+            if self.previous_page is None:  # first page installed on deck
+                with STARTUP_PROFILE.phase("first page render"):
+                    self.current_page.render()
+            else:
+                self.current_page.render()
             logger.debug(f"deck {self.name} ..done")
             logger.info(f"deck {self.name} changed page to {page}")
             return self.current_page.name
@@ -423,6 +459,27 @@ class Deck(ABC):
         self.inc(COCKPITDECKS_INTVAR.DECK_RELOADS.value)
         self.change_page(self.current_page.name)
 
+    def reload_page_file(self, filename: str) -> bool:
+        """Reloads the page loaded from filename, only buttons that changed are rebuilt and rendered.
+
+        Returns False if the change cannot be applied to the loaded page,
+        for example a new page, a changed include file, or changed page attributes.
+        The deck must then be reloaded entirely.
+        """
+        if filename.endswith(DESIGNER_EXTENSION):
+            filename = filename[: -len(DESIGNER_EXTENSION)]
+        filename = os.path.abspath(filename)
+        fn2 = filename + DESIGNER_EXTENSION
+        pages = [p for p in self.pages.values() if p.filename() in [filename, fn2]]
+        if len(pages) == 0:
+            logger.debug(f"deck {self.name}: no page loaded from {filename}")
+            return False
+        page_config = Config(fn2) if os.path.exists(fn2) else PAGE_CONFIGS.get(filename)
+        if not page_config.is_valid() or CONFIG_KW.BUTTONS.value not in page_config:
+            logger.warning(f"deck {self.name}: file {filename} not found or invalid")
+            return False
+        return pages[0].reload(page_config.store)  # page name is a page attribute
+
     def set_home_page(self):
         """Finds and install the home page, if any."""
         if not len(self.pages) > 0:
@@ -531,6 +588,8 @@ class Deck(ABC):
         """Called at end of use of deck to cleanly reset all buttons to a default, neutral state
         and stop deck interaction,
         """
+        if self.render_scheduler is not None:
+            self.render_scheduler.stop()
         for p in self.pages.values():
             p.terminate(disconnected)
         self.pages = {}
@@ -620,6 +679,7 @@ class DeckWithIcons(Deck):
     """
 
     def __init__(self, name: str, config: dict, cockpit: "Cockpit", device=None):
+        self._backgrounds = ImageCache(max_entries=BACKGROUND_CACHE_MAX_ENTRIES)  # background tiles, handed out as copies
         Deck.__init__(self, name=name, config=config, cockpit=cockpit, device=device)
 
     def get_default_icon(self):
@@ -664,6 +724,8 @@ class DeckWithIcons(Deck):
     ):
         """
         Returns a **Pillow Image** of size width x height with either the file specified by texture or a uniform color
+
+        Backgrounds are built once per size, texture and color, callers receive a copy they can draw on.
         """
 
         def get_texture():
@@ -714,9 +776,13 @@ class DeckWithIcons(Deck):
 
         if image is not None:  # found a texture as requested
             logger.debug(f"{who}: use texture {texture_in}")
-            image = image.resize((width, height))
+            key = (width, height, texture_in, None)
+            tile = self._backgrounds.get(key)
+            if tile is None:
+                tile = image.resize((width, height))
+                self._backgrounds.put(key, tile)
             # self.inc(COCKPITDECKS_INTVAR.RENDER_BG_TEXTURE.value)
-            return image
+            return tile.copy()
         if use_texture and texture_in is None:
             logger.debug(f"{who}: should use texture but no texture found, using uniform color")
         # texture = get_texture()
@@ -730,10 +796,14 @@ class DeckWithIcons(Deck):
         # if use_texture and texture is None:
         #     logger.debug(f"{who}: should use texture but no texture found, using uniform color")
         color = get_color()
-        image = Image.new(mode="RGBA", size=(width, height), color=color)
+        key = (width, height, None, color)
+        tile = self._backgrounds.get(key)
+        if tile is None:
+            tile = Image.new(mode="RGBA", size=(width, height), color=color)
+            self._backgrounds.put(key, tile)
         logger.debug(f"{who}: uniform color {color} (color_in={color_in})")
         # self.inc(COCKPITDECKS_INTVAR.RENDER_BG_COLOR.value)
-        return image
+        return tile.copy()
 
     def create_icon_for_key(self, index, colors, texture):
         """Create a default icon for supplied key with proper texture or color"""
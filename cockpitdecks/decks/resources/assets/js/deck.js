@@ -65,6 +65,46 @@ function getNested(obj, ...args) {
   return args.reduce((obj, level) => obj && obj[level], obj)
 }
 
+// Binary image frames
+// Layout: version, code, image format, deck name length D, key length K (1 byte each),
+// deck name (D bytes), key (K bytes), image file content.
+// See cockpitdecks/decks/resources/wsframe.py.
+const FRAME_VERSION = 1
+const FRAME_HEADER_LENGTH = 5
+const IMAGE_FORMATS = ["png", "webp"]  // index is format number in frame header
+
+// Image formats this browser accepts in binary frames, in order of preference
+function supportedImageFormats() {
+    var formats = ["png"]
+    const canvas = document.createElement("canvas");
+    canvas.width = 1
+    canvas.height = 1
+    if (canvas.toDataURL("image/webp").startsWith("data:image/webp")) {
+        formats.unshift("webp")
+    }
+    return formats
+}
+
+function decodeImageFrame(buffer) {
+    const view = new DataView(buffer);
+    if (buffer.byteLength < FRAME_HEADER_LENGTH || view.getUint8(0) != FRAME_VERSION) {
+        console.log("decodeImageFrame: invalid frame");
+        return null;
+    }
+    const code = view.getUint8(1);
+    const format = IMAGE_FORMATS[view.getUint8(2)];
+    const deck_length = view.getUint8(3);
+    const key_length = view.getUint8(4);
+    const decoder = new TextDecoder("utf-8");
+    var offset = FRAME_HEADER_LENGTH
+    const deck = decoder.decode(new Uint8Array(buffer, offset, deck_length));
+    offset = offset + deck_length
+    const key = decoder.decode(new Uint8Array(buffer, offset, key_length));
+    offset = offset + key_length
+    const image = new Blob([new Uint8Array(buffer, offset)], {type: "image/" + format});
+    return {code: code, deck: deck, key: key, format: format, image: image};
+}
+
 // Cache small pointers
 function toDataUrl(url, callback) {
     var xhr = new XMLHttpRequest();
@@ -1063,7 +1103,11 @@ class Deck {
         }
         var that = this
         let buttonImage = new Image();
+        const is_blob = image instanceof Blob  // from binary frame, otherwise base64 string
         buttonImage.onload = function () {
+            if (is_blob) {
+                URL.revokeObjectURL(buttonImage.src);
+            }
             let button = new Konva.Image({
                 x: shape.x() + offset.x,
                 y: shape.y() + offset.y,
@@ -1075,7 +1119,7 @@ class Deck {
             that.image_layer.add(button);
             that.key_images[key] = button
         };
-        buttonImage.src = "data:image/jpeg;base64," + image;
+        buttonImage.src = is_blob ? URL.createObjectURL(image) : "data:image/jpeg;base64," + image;
     }
 
     play_sound(sound, type) {
@@ -98,6 +98,8 @@ class ButtonType:
         if self.layout is not None:
             self.hardware_representation = self.layout.get(DECK_KW.HARDWARE_REPRESENTATION.value)
 
+        self._wallpaper = None  # portion of wallpaper under this button, cropped on first use
+
         self.mosaic = None
         self._tile = False
         mosaic = config.get(DECK_KW.MOSAIC.value)
@@ -163,9 +165,11 @@ class ButtonType:
         if portion is None:
             loggerButtonType.warning("no corners")
             return None
-        offset = self._button_block.offset
-        portion2 = (portion[0] - offset[0], portion[1] - offset[1], portion[2] - offset[0], portion[3] - offset[1])
-        return wallpaper.crop(portion2)
+        if self._wallpaper is None:  # crop it on first call, cache it for after
+            offset = self._button_block.offset
+            portion2 = (portion[0] - offset[0], portion[1] - offset[1], portion[2] - offset[0], portion[3] - offset[1])
+            self._wallpaper = wallpaper.crop(portion2)
+        return self._wallpaper.copy()
 
     def has_drawing(self):
         return self.position is not None and self.dimension is not None
@@ -296,6 +300,7 @@ class DeckTypeBase:
         self.driver = self._config.get(DECK_KW.DRIVER.value)
         self.buttons: Dict[str | int, ButtonType] = {}
         self.background = self._config.get(DECK_KW.BACKGROUND.value)
+        self.max_fps = self._config.get(DECK_KW.MAX_FPS.value)  # max render rate of buttons, None for default
         self.background_image: str | None = None  # full path to background image
         self.background_alternate: str | None = None  # full path to background image
         self._special_displays = None  # cache
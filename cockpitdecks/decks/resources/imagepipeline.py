@@ -0,0 +1,75 @@
+# Key image pipeline for web decks
+#
+# Prepares key images before they are sent to web decks: rounded corners, then encoding.
+# Everything that does not change from one frame to the next is computed once and kept.
+#
+import logging
+import threading
+
+from PIL import Image, ImageDraw
+
+from cockpitdecks.decks.resources.wsframe import ImageEncoder
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+NO_CORNER = -1  # cached radius of keys without rounded corners
+
+
+class KeyImagePipeline:
+    """Per deck image preparation stage.
+
+    Caches corner radius of each key, from the deck type button definitions,
+    and corner alpha masks by image size and radius.
+    Holds the image encoder configured for the deck.
+    """
+
+    def __init__(self, deck_type, encoder: ImageEncoder | None = None):
+        self.deck_type = deck_type
+        self.encoder = encoder if encoder is not None else ImageEncoder()
+        self._radius = {}  # key: corner radius
+        self._masks = {}  # (width, height, radius): alpha mask
+        self._lock = threading.Lock()
+
+    def corner_radius(self, key) -> int | None:
+        radius = self._radius.get(key)
+        if radius is None:
+            radius = NO_CORNER
+            buttondef = self.deck_type.get_button_definition(key)
+            if buttondef is not None:
+                rc = buttondef.get_option("corner_radius")
+                if rc is not None:
+                    radius = int(rc)
+            self._radius[key] = radius
+        return radius if radius != NO_CORNER else None
+
+    def corner_mask(self, size: tuple, radius: int) -> Image.Image:
+        w, h = size
+        mask_key = (w, h, radius)
+        mask = self._masks.get(mask_key)
+        if mask is None:
+            with self._lock:
+                mask = self._masks.get(mask_key)
+                if mask is None:
+                    circle = Image.new("L", (radius * 2, radius * 2), 0)
+                    draw = ImageDraw.Draw(circle)
+                    draw.ellipse((0, 0, radius * 2 - 1, radius * 2 - 1), fill=255)
+                    mask = Image.new("L", size, 255)
+                    mask.paste(circle.crop((0, 0, radius, radius)), (0, 0))
+                    mask.paste(circle.crop((0, radius, radius, radius * 2)), (0, h - radius))
+                    mask.paste(circle.crop((radius, 0, radius * 2, radius)), (w - radius, 0))
+                    mask.paste(circle.crop((radius, radius, radius * 2, radius * 2)), (w - radius, h - radius))
+                    self._masks[mask_key] = mask
+        return mask
+
+    def prepare(self, key, image: Image.Image) -> Image.Image:
+        """Returns image ready to be encoded, with rounded corners if key has some."""
+        radius = self.corner_radius(key)
+        if radius is not None and radius > 0:
+            image.putalpha(self.corner_mask(image.size, radius))
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._radius = {}
+            self._masks = {}
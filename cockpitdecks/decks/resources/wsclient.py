@@ -0,0 +1,191 @@
+# Web deck client connection
+#
+import logging
+import asyncio
+import threading
+import itertools
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+MAX_BACKLOG = 256  # messages, oldest messages are dropped above
+
+_CLIENT_IDS = itertools.count(1)
+
+
+class WebDeckClient:
+    """A web deck connected through a websocket.
+
+    Messages to the web deck are serialized once by the caller and queued.
+    A sender thread per client sends queued messages, so a slow client does not block
+    rendering nor other clients. Messages with a coalesce key, like key images,
+    replace a message with the same key still waiting in the queue.
+    A client is closed when it is stopped or when a send fails.
+    """
+
+    def __init__(self, deck: str, ws, image_format: str | None = None, on_close=None):
+        self.deck = deck
+        self.ws = ws
+        self.image_format = image_format  # for binary frames, None if JSON payloads
+        self.on_close = on_close  # called with client when a send fails
+        self.client_id = next(_CLIENT_IDS)
+        self.name = f"{deck}#{self.client_id}"
+
+        self._queue = OrderedDict()  # coalesce key: (enqueue time, data)
+        self._seq = itertools.count()  # key for messages that cannot be coalesced
+        self._cond = threading.Condition()
+
+        self.running = False
+        self.closed = False
+        self.thread = None
+
+        # Statistics
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_backlog = 0
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._latency_max = 0.0
+
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, data, coalesce_key=None):
+        with self._cond:
+            if coalesce_key is None:
+                coalesce_key = next(self._seq)
+            elif coalesce_key in self._queue:
+                del self._queue[coalesce_key]
+                self.coalesced = self.coalesced + 1
+            self._queue[coalesce_key] = (time.monotonic(), data)
+            while len(self._queue) > MAX_BACKLOG:
+                self._queue.popitem(last=False)
+                self.dropped = self.dropped + 1
+            self.max_backlog = max(self.max_backlog, len(self._queue))
+            self.wakeup()
+
+    def wakeup(self):
+        # Called with lock held when a message is queued
+        self._cond.notify()
+
+    def next_message(self):
+        # Returns oldest message, None if queue is empty
+        with self._cond:
+            if len(self._queue) == 0:
+                return None
+            _, message = self._queue.popitem(last=False)
+            return message
+
+    def message_sent(self, ts: float):
+        latency = time.monotonic() - ts
+        self.sent = self.sent + 1
+        self._latency_sum = self._latency_sum + latency
+        self._latency_count = self._latency_count + 1
+        self._latency_max = max(self._latency_max, latency)
+
+    def send_failed(self):
+        logger.info(f"web deck client {self.name}: send failed, closing")
+        self.closed = True
+        self.running = False
+        if self.on_close is not None:
+            self.on_close(self)
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self.loop, name=f"WebDeckClient::loop({self.name})", daemon=True)
+            self.thread.start()
+            logger.debug(f"web deck client {self.name} started")
+
+    def stop(self):
+        self.closed = True
+        if self.running:
+            with self._cond:
+                self.running = False
+                self._queue = OrderedDict()
+                self.wakeup()
+            logger.debug(f"web deck client {self.name} stopped")
+
+    def loop(self):
+        while self.running:
+            with self._cond:
+                while self.running and len(self._queue) == 0:
+                    self._cond.wait()
+                if not self.running:
+                    break
+                _, (ts, data) = self._queue.popitem(last=False)
+            try:
+                self.ws.send(data)
+            except:
+                self.send_failed()
+                break
+            self.message_sent(ts)
+
+    def stats(self) -> dict:
+        """Returns statistics, latency statistics are reset on each call"""
+        latency = self._latency_sum / self._latency_count if self._latency_count > 0 else 0.0
+        r = {
+            "backlog": self.backlog(),
+            "max_backlog": self.max_backlog,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "latency": latency,
+            "latency_max": self._latency_max,
+        }
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._latency_max = 0.0
+        return r
+
+
+class AsyncWebDeckClient(WebDeckClient):
+    """A web deck connected through an asynchronous (ASGI) websocket.
+
+    Same queue as WebDeckClient, but messages are sent by a task on the server event loop
+    instead of a thread per client. Messages can be queued and client started from any thread.
+    The websocket send() is a coroutine that waits for the client to accept data (backpressure),
+    while waiting, newer images replace older ones in the queue.
+    """
+
+    def __init__(self, deck: str, ws, loop: asyncio.AbstractEventLoop, image_format: str | None = None, on_close=None):
+        WebDeckClient.__init__(self, deck=deck, ws=ws, image_format=image_format, on_close=on_close)
+        self.loop = loop
+        self._pending = asyncio.Event()
+        self.task = None
+
+    def wakeup(self):
+        self.loop.call_soon_threadsafe(self._pending.set)
+
+    def start(self):
+        # May be called from any thread
+        if not self.running:
+            self.running = True
+            self.task = asyncio.run_coroutine_threadsafe(self.loop_async(), self.loop)
+            logger.debug(f"web deck client {self.name} started")
+
+    def send_failed(self):
+        # Client removal is not run on the event loop
+        logger.info(f"web deck client {self.name}: send failed, closing")
+        self.closed = True
+        self.running = False
+        if self.on_close is not None:
+            self.loop.run_in_executor(None, self.on_close, self)
+
+    async def loop_async(self):
+        while self.running:
+            await self._pending.wait()
+            self._pending.clear()
+            message = self.next_message()
+            while self.running and message is not None:
+                ts, data = message
+                try:
+                    await self.ws.send(data)
+                except:
+                    self.send_failed()
+                    return
+                self.message_sent(ts)
+                message = self.next_message()
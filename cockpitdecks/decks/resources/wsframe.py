@@ -0,0 +1,90 @@
+# Binary websocket frames for web decks
+#
+# Images are sent to web decks in binary frames rather than base64 encoded in JSON text frames.
+#
+# Frame layout (all integers unsigned bytes):
+#
+#   0  version (FRAME_VERSION)
+#   1  code (0 = key image, same codes as JSON payloads)
+#   2  image format (index in IMAGE_FORMATS)
+#   3  length of deck name, D
+#   4  length of key, K
+#   5  deck name, UTF-8, D bytes
+#   5+D  key, UTF-8, K bytes
+#   5+D+K  image file content up to end of frame
+#
+# Decoder is in assets/js/deck.js, decodeImageFrame().
+#
+import io
+import base64
+import struct
+
+from PIL import Image, features
+
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("!BBBBB")
+
+# Image formats that can be sent in binary frames.
+# Index in this list is the format number in the frame header.
+IMAGE_FORMATS = ["png", "webp"]
+SUPPORTED_FORMATS = [f for f in IMAGE_FORMATS if f != "webp" or features.check("webp")]
+
+PIL_FORMATS = {"png": "PNG", "webp": "WEBP"}
+PIL_OPTIONS = {"png": {"compress_level": 1}, "webp": {"lossless": True, "quality": 0, "method": 0}}  # lossless, fastest
+
+# Encoder attributes of web deck configuration
+PNG_COMPRESS_LEVEL = "png-compress-level"  # 0 (none) to 9 (smallest)
+WEBP_LOSSLESS = "webp-lossless"
+WEBP_QUALITY = "webp-quality"  # 0 to 100, lossy: image quality, lossless: compression effort
+
+
+def encode_image(image: Image.Image, fmt: str = "png", options: dict | None = None) -> bytes:
+    img_byte_arr = io.BytesIO()
+    image.save(img_byte_arr, format=PIL_FORMATS[fmt], **(options if options is not None else PIL_OPTIONS[fmt]))
+    return img_byte_arr.getvalue()
+
+
+class ImageEncoder:
+    """Encoder options of a web deck, for each image format.
+
+    Image format is negotiated with each web deck client, options only adjust how images are encoded in that format.
+    """
+
+    def __init__(self, config: dict | None = None):
+        config = config if config is not None else {}
+        self.options = {fmt: opts.copy() for fmt, opts in PIL_OPTIONS.items()}
+        if PNG_COMPRESS_LEVEL in config:
+            self.options["png"]["compress_level"] = min(9, max(0, int(config[PNG_COMPRESS_LEVEL])))
+        if WEBP_LOSSLESS in config:
+            self.options["webp"]["lossless"] = bool(config[WEBP_LOSSLESS])
+            if not self.options["webp"]["lossless"] and WEBP_QUALITY not in config:
+                self.options["webp"]["quality"] = 80  # Pillow default for lossy images
+        if WEBP_QUALITY in config:
+            self.options["webp"]["quality"] = min(100, max(0, int(config[WEBP_QUALITY])))
+
+    def encode(self, image: Image.Image, fmt: str = "png") -> bytes:
+        return encode_image(image, fmt, self.options[fmt])
+
+    def __repr__(self) -> str:
+        return f"ImageEncoder({self.options})"
+
+
+def image_frame(code: int, deck: str, key, fmt: str, content: bytes) -> bytes:
+    deck_bytes = deck.encode("utf-8")
+    key_bytes = str(key).encode("utf-8")
+    return FRAME_HEADER.pack(FRAME_VERSION, code, IMAGE_FORMATS.index(fmt), len(deck_bytes), len(key_bytes)) + deck_bytes + key_bytes + content
+
+
+def image_payload(code: int, deck: str, key, content: bytes, meta: dict) -> dict:
+    """Legacy JSON payload, PNG image base64 encoded, for web decks that do not accept binary frames"""
+    return {"code": code, "deck": deck, "key": key, "image": base64.encodebytes(content).decode("ascii"), "meta": meta}
+
+
+def accepted_format(formats: list | None) -> str | None:
+    """Returns first format requested by the web deck that we can produce, None if web deck only accepts JSON payloads"""
+    if formats is None:
+        return None
+    for fmt in formats:
+        if fmt in SUPPORTED_FORMATS:
+            return fmt
+    return None
@@ -4,16 +4,15 @@
 # Receives interactions from VirtualDeckUI
 #
 import logging
-import io
 import base64
 from datetime import datetime
 
-from PIL import Image, ImageDraw
-
-from cockpitdecks import __version__, DEFAULT_PAGE_NAME
+from cockpitdecks import __version__, DEFAULT_PAGE_NAME, DECK_KW
 from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
 from cockpitdecks.deck import DeckWithIcons
 from cockpitdecks.decks.resources.virtualdeckmanager import VirtualDeckManager
+from cockpitdecks.decks.resources.imagepipeline import KeyImagePipeline
+from cockpitdecks.decks.resources.wsframe import ImageEncoder
 
 from cockpitdecks.event import Event, PushEvent, EncoderEvent, TouchEvent, SlideEvent
 from cockpitdecks.page import Page
@@ -54,6 +53,11 @@ class VirtualDeck(DeckWithIcons):
 
         self.init()
 
+        # Corner masks, button definitions and encoder used to send key images
+        encoder = ImageEncoder(config=self._config.get(DECK_KW.IMAGE_ENCODER.value))
+        self.image_pipeline = KeyImagePipeline(deck_type=self.deck_type, encoder=encoder)
+        logger.debug(f"deck {self.name}: {encoder}")
+
     def set_clients(self, clients):
         self.clients = clients
         if self.is_connected():
@@ -74,7 +78,7 @@ class VirtualDeck(DeckWithIcons):
         return self.clients > 0
 
     def is_connected(self) -> bool:
-        return self.cockpit.probe(self.name)
+        return self.cockpit.is_deck_connected(self.name)
 
     def unload_current_page(self):
         if self.current_page is not None:
@@ -228,40 +232,18 @@ class VirtualDeck(DeckWithIcons):
         self.cockpit.send(deck=self.name, payload=payload)
 
     def set_key_icon(self, key, image):
-        # Sends the PIL Image bytes with a few meta to Flask for web display
-        # Image is sent as a stream of bytes which is the file content of the image saved in PNG format
+        # Sends the PIL Image with a few meta to Flask for web display
+        # Image is sent as the file content of the image saved in PNG or WebP format,
+        # in a binary websocket frame, or base64 encoded in a JSON payload for older web decks.
         # Need to supply deck name as well.
-        def add_corners(im, rad):
-            circle = Image.new("L", (rad * 2, rad * 2), 0)
-            draw = ImageDraw.Draw(circle)
-            draw.ellipse((0, 0, rad * 2 - 1, rad * 2 - 1), fill=255)
-            alpha = Image.new("L", im.size, 255)
-            w, h = im.size
-            alpha.paste(circle.crop((0, 0, rad, rad)), (0, 0))
-            alpha.paste(circle.crop((0, rad, rad, rad * 2)), (0, h - rad))
-            alpha.paste(circle.crop((rad, 0, rad * 2, rad)), (w - rad, 0))
-            alpha.paste(circle.crop((rad, rad, rad * 2, rad * 2)), (w - rad, h - rad))
-            im.putalpha(alpha)
-            return im
-
         # if not self.has_clients():
         #     logger.debug(f"deck {self.name} has no client")
         #     return
 
-        buttondef = self.deck_type.get_button_definition(key)
-        rc = buttondef.get_option("corner_radius")
-        # rc = int(image.width / 8)
-        if rc is not None:
-            image = add_corners(image, int(rc))
-        width, height = image.size
-
-        img_byte_arr = io.BytesIO()
+        image = self.image_pipeline.prepare(key, image)
         # transformed = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM)  # ?!
-        image.save(img_byte_arr, format="PNG")
-        content = img_byte_arr.getvalue()
         meta = {"ts": datetime.now().timestamp()}  # dummy
-        payload = {"code": 0, "deck": self.name, "key": key, "image": base64.encodebytes(content).decode("ascii"), "meta": meta}
-        self.cockpit.send(deck=self.name, payload=payload)
+        self.cockpit.send_image(deck=self.name, key=key, image=image, meta=meta, encoder=self.image_pipeline.encoder)
 
     def fill_empty_hardware_representation(self, key, page):
         config = self.deck_type.get_empty_button_config(key)
@@ -273,37 +255,14 @@ class VirtualDeck(DeckWithIcons):
             logger.warning(f"{self.name}: no empty hardware representation for {key}")
 
     def _send_hardware_key_image_to_device(self, key, image, metadata):
-        def add_corners(im, rad):
-            circle = Image.new("L", (rad * 2, rad * 2), 0)
-            draw = ImageDraw.Draw(circle)
-            draw.ellipse((0, 0, rad * 2 - 1, rad * 2 - 1), fill=255)
-            alpha = Image.new("L", im.size, 255)
-            w, h = im.size
-            alpha.paste(circle.crop((0, 0, rad, rad)), (0, 0))
-            alpha.paste(circle.crop((0, rad, rad, rad * 2)), (0, h - rad))
-            alpha.paste(circle.crop((rad, 0, rad * 2, rad)), (w - rad, 0))
-            alpha.paste(circle.crop((rad, rad, rad * 2, rad * 2)), (w - rad, h - rad))
-            im.putalpha(alpha)
-            return im
-
         if not self.has_clients():
             logger.debug(f"deck {self.name} has no client")
             return
 
-        buttondef = self.deck_type.get_button_definition(key)
-        rc = buttondef.get_option("corner_radius")
-        # rc = int(image.width / 8)
-        if rc is not None:
-            image = add_corners(image, int(rc))
-        width, height = image.size
-        img_byte_arr = io.BytesIO()
+        image = self.image_pipeline.prepare(key, image)
         # transformed = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM)  # ?!
-        image.save(img_byte_arr, format="PNG")
-        content = img_byte_arr.getvalue()
         meta = {"ts": datetime.now().timestamp()}  # dummy
-        payload = {"code": 0, "deck": self.name, "key": key, "image": base64.encodebytes(content).decode("ascii"), "meta": meta}
-        # print(">>>>>", {"code": 0, "deck": self.name, "key": key, "image": image, "meta": meta})
-        self.cockpit.send(deck=self.name, payload=payload)
+        self.cockpit.send_image(deck=self.name, key=key, image=image, meta=meta, encoder=self.image_pipeline.encoder)
 
     def _set_key_image(self, button: Button):  # idx: int, image: str, label: str = None):
         if self.device is None:
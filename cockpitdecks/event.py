@@ -1,9 +1,11 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
 from datetime import datetime
 from math import sqrt
 import logging
 import json
+import threading
 
 from cockpitdecks import DECK_ACTIONS
 
@@ -44,6 +46,16 @@ class Event(ABC):
         """Event creation timestamp"""
         return self._ts
 
+    @property
+    def priority(self) -> bool:
+        """Whether event is processed before normal priority events"""
+        return False
+
+    @property
+    def coalesce_key(self) -> str | None:
+        """Pending events with the same key are coalesced, only the latest is kept"""
+        return None
+
     def is_replay(self) -> bool:
         return self._replay
 
@@ -123,6 +135,11 @@ class DeckEvent(Event):
         """Event deck action type"""
         return self.REQUIRED_DECK_ACTIONS
 
+    @property
+    def priority(self) -> bool:
+        """Deck input events are processed before simulator events"""
+        return True
+
     @property
     def event(self) -> str:
         """Event type"""
@@ -426,3 +443,100 @@ class TouchEvent(DeckEvent):
                 autorun=autorun,
             )
         return None
+
+
+class AutoRepeatEvent(Event):
+    """Event for one repetition of the command of a button held pressed.
+
+    Created on each auto repeat tick of the animation clock, so that the command,
+    which usually reaches the simulator, is executed in the event loop and never blocks the clock.
+    """
+
+    def __init__(self, activation: "Activation", autorun: bool = True):
+        self.activation = activation
+        Event.__init__(self, autorun=autorun)
+
+    def __str__(self):
+        return f"{self.activation.button_name}:auto-repeat:{self.timestamp}"
+
+    @property
+    def coalesce_key(self) -> tuple:
+        """At most one pending repetition per button"""
+        return ("auto-repeat", id(self.activation))
+
+    def info(self):
+        return super().info() | {"button": self.activation.button_name}
+
+    def run(self, just_do_it: bool = False) -> bool:
+        if just_do_it:
+            try:
+                self.handling()
+                self.activation.auto_repeat_execute()
+                self.handled()
+            except:
+                logger.warning(f"..done with error: button {self.activation.button_name}", exc_info=True)
+                return False
+        else:
+            self.activation.cockpit.event_queue.put(self)
+        return True
+
+
+class EventQueue:
+    """Event queue with priority lanes.
+
+    Drop-in replacement for queue.Queue for the cockpit event loop.
+    Priority events (deck input events and control strings like "reload", "terminate")
+    are always returned before normal events (simulator events).
+    Pending normal events with the same coalesce key are replaced by the latest one,
+    so only the latest simulator value for a given variable is applied.
+    If maxsize is set, the oldest normal event is dropped when the normal lane is full.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._priority = deque()
+        self._normal = OrderedDict()
+        self._seq = 0  # unique key for events that cannot be coalesced
+        self._not_empty = threading.Condition(threading.Lock())
+
+        # Statistics
+        self.coalesced = 0
+        self.dropped = 0
+
+    def put(self, event):
+        with self._not_empty:
+            if type(event) is str or event.priority:
+                self._priority.append(event)
+            else:
+                key = event.coalesce_key
+                if key is None:
+                    self._seq = self._seq + 1
+                    key = self._seq
+                elif key in self._normal:
+                    old = self._normal.pop(key)
+                    if hasattr(old, "cascade") and hasattr(event, "cascade"):
+                        event.cascade = event.cascade or old.cascade  # do not loose notification
+                    self.coalesced = self.coalesced + 1
+                if self.maxsize > 0 and len(self._normal) >= self.maxsize:
+                    self._normal.popitem(last=False)
+                    self.dropped = self.dropped + 1
+                self._normal[key] = event
+            self._not_empty.notify()
+
+    def get(self):
+        # blocks until an event is available
+        with self._not_empty:
+            while len(self._priority) == 0 and len(self._normal) == 0:
+                self._not_empty.wait()
+            if len(self._priority) > 0:
+                return self._priority.popleft()
+            return self._normal.popitem(last=False)[1]
+
+    def qsize(self) -> int:
+        return len(self._priority) + len(self._normal)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def stats(self) -> dict:
+        return {"priority": len(self._priority), "normal": len(self._normal), "coalesced": self.coalesced, "dropped": self.dropped}
@@ -3,7 +3,7 @@
 import logging
 from typing import Dict
 
-from cockpitdecks import ID_SEP, DEFAULT_ATTRIBUTE_PREFIX
+from cockpitdecks import ID_SEP, DEFAULT_ATTRIBUTE_PREFIX, CONFIG_KW, CONFIG_FILENAME
 from cockpitdecks.decks.resources.decktype import DeckType
 from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
 from cockpitdecks.simulator import SimulatorVariable
@@ -36,6 +36,10 @@ class Page:
     def get_id(self):
         return ID_SEP.join([self.deck.get_id(), self.name])
 
+    def filename(self) -> str | None:
+        """Returns file the page was loaded from"""
+        return self._config.get(CONFIG_FILENAME)
+
     def inc(self, name: str, amount: float = 1.0, cascade: bool = False):
         self.sim.inc_internal_variable(name=ID_SEP.join([self.get_id(), name]), amount=amount, cascade=cascade)
 
@@ -152,6 +156,88 @@ class Page:
                 logger.warning(f"page {self.name}: could not add button button ({button_config}), ignored", exc_info=True)
         return built
 
+    @staticmethod
+    def button_definitions(config: dict) -> dict:
+        """Returns button definitions in page configuration by button index"""
+        buttons = {}
+        for button_config in config.get(CONFIG_KW.BUTTONS.value, []):
+            idx = Button.guess_index(button_config)
+            if idx is not None:
+                buttons[idx] = button_config
+        return buttons
+
+    def reload(self, config: dict) -> bool:
+        """Reloads page from new page configuration, only buttons whose definition changed are rebuilt.
+
+        Monitored simulator variables are adjusted by difference and only affected keys are rendered again.
+        Buttons coming from includes are kept.
+        Returns False if page attributes changed, the page must then be loaded again entirely.
+        """
+
+        def attributes(c: dict) -> dict:
+            return {k: v for k, v in c.items() if k not in [CONFIG_KW.BUTTONS.value, CONFIG_FILENAME]}
+
+        if attributes(config) != attributes(self._config):
+            logger.debug(f"page {self.name}: page attributes changed")
+            return False
+
+        old_buttons = Page.button_definitions(self._config)
+        new_buttons = Page.button_definitions(config)
+        indices = list(old_buttons) + [idx for idx in new_buttons if idx not in old_buttons]
+        changed = [idx for idx in indices if old_buttons.get(idx) != new_buttons.get(idx)]
+        self._config = config
+        if len(changed) == 0:
+            logger.debug(f"page {self.name}: no button changed")
+            return True
+
+        current = self.is_current_page()
+        before = self.simulator_variables.copy()
+
+        # 1. Remove changed buttons
+        for idx in changed:
+            button = self.buttons.get(idx)
+            if button is None or idx not in old_buttons:
+                continue
+            if current:
+                button.clean()
+            self.unregister_simulator_variable(button)
+            del self.buttons[idx]
+            if self.button_names.get(button.name) == button:
+                del self.button_names[button.name]
+
+        # 2. Build new versions, they register their variables with the page
+        built = self.load_buttons(buttons=[new_buttons[idx] for idx in changed if idx in new_buttons], deck_type=self.deck.deck_type)
+
+        # 3. Adjust simulator variables
+        used = set()
+        for button in self.buttons.values():
+            if button.all_datarefs is not None:
+                used = used | button.all_datarefs
+        self.simulator_variables = {d: v for d, v in self.simulator_variables.items() if d in used}
+        if current and self.sim is not None:
+            added = {d: v for d, v in self.simulator_variables.items() if d not in before}
+            removed = {d: v for d, v in before.items() if d not in self.simulator_variables}
+            if len(added) > 0:
+                self.sim.add_simulator_variables_to_monitor(simulator_variables=added, reason=f"reload page {self.name}")
+            if len(removed) > 0:
+                self.sim.remove_simulator_variables_to_monitor(simulator_variables=removed, reason=f"reload page {self.name}")
+
+        # 4. Render affected keys
+        if current:
+            for button in built:
+                button.render()
+            for idx in changed:
+                if idx not in self.buttons:  # removed
+                    if self.fill_empty_keys:
+                        self.deck.fill_empty(idx)
+                    else:
+                        self.deck.clean_empty(idx)
+
+        self.inc(COCKPITDECKS_INTVAR.PAGE_RELOADS.value)
+        self.inc(COCKPITDECKS_INTVAR.PAGE_RELOADED_BUTTONS.value, amount=len(changed))
+        logger.info(f"page {self.name}: reloaded {len(changed)} buttons ({', '.join([str(i) for i in changed])})")
+        return True
+
     def inspect(self, what: str | None = None):
         """
         This function is called on all buttons of this Page.
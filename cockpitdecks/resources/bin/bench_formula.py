@@ -0,0 +1,69 @@
+# Micro-benchmark of formula evaluation.
+# Compares the string path (substitute values in formula, then parse and evaluate with RPC)
+# with the compiled path (formula parsed once into a RPCProgram, slots bound to Variables).
+#
+# python cockpitdecks/resources/bin/bench_formula.py
+#
+import timeit
+
+from cockpitdecks.variable import Variable, VariableListener
+from cockpitdecks.strvar import Formula
+
+NUMBER = 100000
+
+FORMULAS = [
+    "${sim/cockpit2/gauges/actuators/barometer_setting_in_hg_pilot} 33.86389 * round",
+    "${sim/flightmodel/position/indicated_airspeed} ${sim/flightmodel/position/vh_ind_fpm} 100 / + 2 roundn",
+    "${data:bench_counter} 2 % ${sim/cockpit/electrical/battery_on} * abs",
+]
+
+
+class BenchOwner(VariableListener):
+    """Minimal formula owner, provides variables and their values."""
+
+    def __init__(self):
+        VariableListener.__init__(self, name="bench")
+        self.name = "bench"
+        self.variables = {}
+
+    def get_id(self):
+        return self.name
+
+    def get_variable(self, name: str, is_string: bool = False):
+        if name not in self.variables:
+            self.variables[name] = Variable(name=name)
+            self.variables[name].update_value(12.3456)
+        return self.variables[name]
+
+    def get_internal_variable_value(self, internal_variable, default=None):
+        return self.get_simulator_variable_value(internal_variable, default=default)
+
+    def get_simulator_variable_value(self, simulator_variable, default=None):
+        v = self.variables.get(simulator_variable)
+        return v.value if v is not None and v.value is not None else default
+
+    def variable_changed(self, data: Variable):
+        pass
+
+
+def bench(formula: str):
+    owner = BenchOwner()
+    Formula.COMPILED = False
+    string_formula = Formula(owner=owner, formula=formula)
+    Formula.COMPILED = True
+    compiled_formula = Formula(owner=owner, formula=formula)
+
+    r1 = string_formula.execute_formula()
+    r2 = compiled_formula.execute_formula()
+    assert r1 == r2, f"different results {r1} != {r2}"
+
+    t1 = timeit.timeit(string_formula.execute_formula, number=NUMBER)
+    t2 = timeit.timeit(compiled_formula.execute_formula, number=NUMBER)
+    print(formula)
+    print(f"    string:   {1000000 * t1 / NUMBER:7.2f} µs/evaluation")
+    print(f"    compiled: {1000000 * t2 / NUMBER:7.2f} µs/evaluation (x{t1 / t2:.1f})")
+
+
+if __name__ == "__main__":
+    for f in FORMULAS:
+        bench(f)
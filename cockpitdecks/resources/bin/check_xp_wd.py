@@ -0,0 +1,143 @@
+# Checks X-Plane weather dataref collection against a local stub of the X-Plane REST API.
+# The stub serves canned /datarefs and /datarefs/{id}/value responses and counts requests,
+# so that collect_weather_datarefs() and further_than() can be checked without X-Plane.
+#
+# python cockpitdecks/resources/bin/check_xp_wd.py
+#
+import os
+import sys
+import json
+import tempfile
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# xp_wd.py is a standalone script, not part of a package (weather.py shadows the weather folder).
+# It imports the dataref fetcher from cockpitdecks, so repository root is also added for runs from a source tree.
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(HERE, "..", "..", "..")))
+sys.path.insert(0, os.path.join(HERE, "..", "weather"))
+
+from xp_wd import (
+    XPWeatherData,
+    WEATHER_LOCATION,
+    REGION_DATAREFS,
+    DATAREF_LOCATION,
+    DATAREF_REGION_CLOUD,
+    DATAREF_REGION_WIND,
+)
+
+API = "/api/v1/datarefs"
+
+STATION = (50.0, 4.0)  # lat, lon
+POSITION = (50.1, 4.0)  # about 11 km north of station
+
+CLOUD_LAYERS = 3
+WIND_LAYERS = 13
+
+
+def canned_value(name: str):
+    if name == DATAREF_LOCATION["latitude"]:
+        return POSITION[0]
+    if name == DATAREF_LOCATION["longitude"]:
+        return POSITION[1]
+    if name in DATAREF_REGION_CLOUD.values():
+        return [1000.0 * (i + 1) for i in range(CLOUD_LAYERS)]
+    if name in DATAREF_REGION_WIND.values():
+        return [500.0 * (i + 1) for i in range(WIND_LAYERS)]
+    return 1.0
+
+
+class StubXPlane(BaseHTTPRequestHandler):
+    """Minimal X-Plane REST API: dataref identifier lookup by name and dataref value."""
+
+    names = sorted(set(REGION_DATAREFS.values()))
+    ids = {name: 1000 + i for i, name in enumerate(names)}
+    by_id = {i: name for name, i in ids.items()}
+    requests = {"filter": 0, "value": 0}
+    lock = threading.Lock()
+
+    def reply(self, data, status: int = 200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == API:
+            with self.lock:
+                self.requests["filter"] = self.requests["filter"] + 1
+            names = parse_qs(url.query).get("filter[name]", [])
+            self.reply({"data": [{"id": self.ids[n], "name": n} for n in names if n in self.ids]})
+            return
+        parts = url.path[len(API) :].strip("/").split("/")
+        if url.path.startswith(API) and len(parts) == 2 and parts[1] == "value" and int(parts[0]) in self.by_id:
+            with self.lock:
+                self.requests["value"] = self.requests["value"] + 1
+            self.reply({"data": canned_value(self.by_id[int(parts[0])])})
+            return
+        self.reply({"error_code": "dataref_not_found"}, status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def requests_made() -> dict:
+    with StubXPlane.lock:
+        r = StubXPlane.requests.copy()
+        StubXPlane.requests["filter"] = 0
+        StubXPlane.requests["value"] = 0
+    return r
+
+
+def check():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubXPlane)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}{API}"
+    count = len(set(REGION_DATAREFS.values()))
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)  # weather cache file is written in current directory
+        w = XPWeatherData(api_url=api_url, weather_type=WEATHER_LOCATION.REGION.value, update=True)
+        try:
+            # Full collection: identifiers resolved in bulk, one value request per dataref
+            r = requests_made()
+            assert r == {"filter": 1, "value": count}, r
+            assert w.weather.latitude == POSITION[0] and w.weather.longitude == POSITION[1]
+            assert len(w.cloud_layers) == CLOUD_LAYERS and w.cloud_layers[0].base == 1000.0
+            assert len(w.wind_layers) == WIND_LAYERS and w.wind_layers[-1].alt_msl == 500.0 * WIND_LAYERS
+            print(f"collect_weather_datarefs: {count} datarefs, {r['filter']} identifier request, {r['value']} value requests")
+
+            # Identifiers are kept between collections
+            drefs = w.collect_weather_datarefs()
+            r = requests_made()
+            assert r == {"filter": 0, "value": count}, r
+            assert drefs[DATAREF_REGION_WIND["alt_msl"] + "[12]"] == 500.0 * WIND_LAYERS
+            print(f"collect_weather_datarefs again: {r['filter']} identifier request, {r['value']} value requests")
+
+            # Distance to station only fetches position and does not rewrite weather cache
+            assert w.further_than(kilometers=50)  # no station yet
+            assert requests_made() == {"filter": 0, "value": 0}
+            cache = {fn: os.path.getmtime(fn) for fn in os.listdir(folder)}
+            w.setStation(SimpleNamespace(icao="TEST", latitude=STATION[0], longitude=STATION[1]))
+            assert not w.further_than(kilometers=50)
+            assert w.further_than(kilometers=5)
+            r = requests_made()
+            assert r == {"filter": 0, "value": 4}, r
+            assert {fn: os.path.getmtime(fn) for fn in os.listdir(folder)} == cache
+            print(f"further_than: {r['value'] // 2} value requests per call, weather cache untouched")
+        finally:
+            w.close()
+            os.chdir(cwd)
+    server.shutdown()
+    server.server_close()
+    print("ok")
+
+
+if __name__ == "__main__":
+    check()
@@ -0,0 +1,133 @@
+# Cache of parsed configuration files
+#
+# Parsing YAML files is one of the main costs of loading decks.
+# Parsed content of page files is kept in memory and in a file in each layout folder,
+# keyed on file modification time and size. Only changed files are parsed again.
+#
+# Cache files are JSON, never unpickled, since layout folders are often supplied by third parties.
+#
+#   _page_cache.json   {"version": CONFIG_CACHE_VERSION, "entries": {file name: [mtime_ns, size, parsed content as JSON text]}}
+#
+import logging
+import os
+import json
+import threading
+
+from cockpitdecks import Config
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+CONFIG_CACHE_VERSION = 2
+CONFIG_CACHE_FILE = "_page_cache.json"
+
+
+class ConfigCache:
+    """Parsed configuration files, by folder.
+
+    Content is kept as JSON text, each get() returns a fresh copy that the caller can modify.
+    Files whose content does not survive a JSON round trip unchanged (dates, non string keys...)
+    are not cached and always parsed.
+    """
+
+    def __init__(self):
+        self._folders = {}  # folder: {file name: [mtime_ns, size, content as JSON text]}
+        self._changed = set()  # folders with entries not saved
+        self._lock = threading.RLock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def entries(self, folder: str) -> dict:
+        folder = os.path.abspath(folder)
+        with self._lock:
+            entries = self._folders.get(folder)
+            if entries is None:
+                entries = {}
+                fn = os.path.join(folder, CONFIG_CACHE_FILE)
+                if os.path.exists(fn):
+                    try:
+                        with open(fn, "r") as fp:
+                            data = json.load(fp)
+                        if data.get("version") == CONFIG_CACHE_VERSION:
+                            entries = data.get("entries", {})
+                        else:
+                            logger.info(f"config cache {fn} has version {data.get('version')}, ignored")
+                    except:
+                        logger.warning(f"config cache {fn} cannot be read, ignored", exc_info=True)
+                self._folders[folder] = entries
+            return entries
+
+    def get(self, filename: str) -> Config:
+        """Returns configuration in file, parsed again only if file changed since it was cached."""
+        filename = os.path.abspath(filename)
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return Config(filename)  # reports missing file
+        folder, name = os.path.split(filename)
+        with self._lock:
+            entries = self.entries(folder)
+            entry = entries.get(name)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self.hits = self.hits + 1
+                config = Config(filename=None)
+                config.store = json.loads(entry[2])
+                return config
+            self.misses = self.misses + 1
+        config = Config(filename)
+        if config.is_valid():
+            content = ConfigCache.serialize(config.store)
+            if content is not None:
+                with self._lock:
+                    entries[name] = [st.st_mtime_ns, st.st_size, content]
+                    self._changed.add(folder)
+            else:
+                logger.debug(f"config {filename} cannot be cached")
+        return config
+
+    @staticmethod
+    def serialize(store: dict) -> str | None:
+        """Returns store as JSON text, None if it cannot be restored identically from JSON."""
+        try:
+            content = json.dumps(store)
+            if json.loads(content) == store:
+                return content
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def save(self, folder: str):
+        """Writes cache of folder if it changed."""
+        folder = os.path.abspath(folder)  # same key as get()
+        with self._lock:
+            if folder not in self._changed:
+                return
+            self._changed.discard(folder)
+            data = {"version": CONFIG_CACHE_VERSION, "entries": self._folders.get(folder, {})}
+        fn = os.path.join(folder, CONFIG_CACHE_FILE)
+        try:
+            tmp = fn + ".tmp"
+            with open(tmp, "w") as fp:
+                json.dump(data, fp)
+            os.replace(tmp, fn)
+            logger.debug(f"config cache {fn} saved")
+        except OSError:
+            logger.warning(f"config cache {fn} cannot be saved", exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._folders = {}
+            self._changed = set()
+
+    def stats(self) -> dict:
+        return {
+            "folders": len(self._folders),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Process-wide cache of page configurations
+PAGE_CONFIGS = ConfigCache()
@@ -0,0 +1,122 @@
+# Bulk dataref fetcher for X-Plane REST API
+#
+# Fetches many dataref values at once, for collectors that need more datarefs
+# than what is reasonable to monitor through the simulator connection (multiplayer aircraft, TCAS targets, weather...).
+#
+import logging
+import base64
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+DATA = "data"
+IDENT = "id"
+NAME = "name"
+
+FETCHER_MAX_WORKERS = 8  # concurrent value requests
+FETCHER_MAX_NAMES = 64  # dataref names per identifier request, keeps URL short
+FETCHER_TIMEOUT = 5  # seconds
+
+
+class DatarefFetcher:
+    """Fetches dataref values through X-Plane REST API.
+
+    Dataref identifiers are resolved in bulk, with one filtered request for many names, and kept.
+    Values are fetched concurrently, with at most max_workers requests in flight,
+    over a pool of persistent HTTP connections.
+    String datarefs (base64 encoded byte arrays) are decoded.
+    Fetches can be run in the background, results are then handed to a callback,
+    so that callers like representations never wait for the network.
+    """
+
+    def __init__(self, api_url: str, max_workers: int = FETCHER_MAX_WORKERS, timeout: float = FETCHER_TIMEOUT):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.ids = {}  # dataref name: dataref id
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DatarefFetcher")
+        self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DatarefFetcher::job")  # background fetches, one at a time
+
+    @staticmethod
+    def decode(value, nullas: str = ""):
+        """Decodes base64 encoded string datarefs, null bytes are replaced by nullas. Other values are returned as is."""
+        if type(value) in [bytes, str]:
+            return base64.b64decode(value)[:-1].decode("ascii", errors="replace").replace("\u0000", nullas)
+        return value
+
+    def resolve(self, datarefs: list):
+        """Resolves identifiers of datarefs not already resolved."""
+        unknown = [d for d in datarefs if d not in self.ids]
+        for i in range(0, len(unknown), FETCHER_MAX_NAMES):
+            payload = [("filter[name]", d) for d in unknown[i : i + FETCHER_MAX_NAMES]]
+            try:
+                response = self.session.get(self.api_url, params=payload, timeout=self.timeout)
+                resp = response.json()
+            except:
+                logger.warning("cannot resolve dataref identifiers", exc_info=True)
+                return
+            if DATA not in resp:
+                logger.warning(f"cannot resolve dataref identifiers: {resp}")
+                continue
+            for specs in resp[DATA]:
+                if NAME in specs and IDENT in specs:
+                    self.ids[specs[NAME]] = specs[IDENT]
+        missing = [d for d in unknown if d not in self.ids]
+        if len(missing) > 0:
+            logger.warning(f"datarefs not found: {missing}")
+
+    def get_value(self, path: str, nullas: str = ""):
+        ident = self.ids.get(path)
+        if ident is None:
+            return None
+        try:
+            response = self.session.get(f"{self.api_url}/{ident}/value", timeout=self.timeout)
+            data = response.json()
+        except:
+            logger.warning(f"no value for {path}", exc_info=True)
+            return None
+        if DATA in data:
+            return DatarefFetcher.decode(data[DATA], nullas=nullas)
+        logger.warning(f"no value for {path}")
+        self.ids.pop(path, None)  # identifier may no longer be valid, resolved again on next fetch
+        return None
+
+    def fetch(self, datarefs: list, nullas: dict | None = None) -> dict:
+        """Returns values of datarefs, blocks until all values are fetched.
+        nullas gives the replacement of null bytes for string datarefs, per dataref name.
+        """
+        self.resolve(datarefs)
+        nullas = nullas if nullas is not None else {}
+        values = self._workers.map(lambda d: self.get_value(d, nullas=nullas.get(d, "")), datarefs)
+        return dict(zip(datarefs, values))
+
+    def submit(self, fn, *args, callback=None) -> Future:
+        """Runs fn(*args) in the background and calls callback with its result, if supplied."""
+        future = self._jobs.submit(fn, *args)
+        if callback is not None:
+
+            def done(f: Future):
+                if f.exception() is not None:
+                    logger.warning(f"background fetch failed: {f.exception()}")
+                    return
+                callback(f.result())
+
+            future.add_done_callback(done)
+        return future
+
+    def fetch_async(self, datarefs: list, callback, nullas: dict | None = None) -> Future:
+        """Fetches values of datarefs in the background, callback is called with the values."""
+        return self.submit(self.fetch, datarefs, nullas, callback=callback)
+
+    def close(self):
+        self._jobs.shutdown(wait=False, cancel_futures=True)
+        self._workers.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -1,21 +1,9 @@
-import requests
-import base64
 from datetime import datetime
 
+from cockpitdecks.resources.datareffetcher import DatarefFetcher
+
 # BASE_URL = "http://localhost:8086/api/v1/datarefs"
 BASE_URL = "http://192.168.1.140:8080/api/v1/datarefs"
-DATA = "data"
-IDENT = "id"
-NAME = "name"
-
-
-def get_dataref_value_by_id(ident: int, nullas: str = ""):
-    url = f"{BASE_URL}/{ident}/value"
-    response = requests.get(url)
-    data = response.json()
-    if DATA in data and type(data[DATA]) in [bytes, str]:
-        return base64.b64decode(data[DATA])[:-1].decode("ascii").replace("\u0000", nullas)
-    return data[DATA]
 
 
 # sim/multiplayer/position/plane23_prop
@@ -36,8 +24,8 @@ class Aircraft:
         p = self.props
         return f'{p["ICAOairline"].ljust(4)} {p["flightnum"].ljust(7)} {p["apt_from"].ljust(4)} {p["apt_to"].ljust(4)} {p["ICAO"].ljust(4)} {p["tailnum"].ljust(7)}'
 
-    def datarefs(self):
-        return [f"{ACBASE}{self.index}_{s}" for s in self.props.keys()]
+    def datarefs(self, props: list | None = None):
+        return [f"{ACBASE}{self.index}_{s}" for s in (props if props is not None else self.props.keys())]
 
     def defined(self) -> bool:
         for p in ACBOOT:
@@ -45,13 +33,18 @@ class Aircraft:
                 return True
         return False
 
-    def collect(self, ids) -> bool:
-        self.props = {s: get_dataref_value_by_id(ids[f"{ACBASE}{self.index}_{s}"]) for s in ACBOOT}
-        if self.defined():
-            self.props = self.props | {s: get_dataref_value_by_id(ids[f"{ACBASE}{self.index}_{s}"]) for s in ACUNBOOT}
+    def collect(self, values: dict, props: list) -> bool:
+        """Sets props from fetched values, returns True if a prop changed"""
+        changed = False
+        for s in props:
+            v = values.get(f"{ACBASE}{self.index}_{s}")
+            v = v if v is not None else ""
+            if self.props[s] != v:
+                self.props[s] = v
+                changed = True
+        if changed:
             self._last_updated = datetime.now()
-            return True
-        return False
+        return changed
 
 
 class TCASEntry:
@@ -88,49 +81,44 @@ class DatarefCollector:
         "sim/cockpit2/tcas/targets/icao_type",  # byte[512]   y   string  7 character ICAO code, terminated by 0 byte. C172, B738, etc... see https://www.icao.int/publications/DOC8643/Pages/Search.aspx
     ]
 
-    def __init__(self) -> None:
-        self.aircrafts = []
-        self.tcas = {}
-        self.tcas_datarefs = {}
-        self.ac_datarefs = {}
+    def __init__(self, api_url: str = BASE_URL) -> None:
+        self.fetcher = DatarefFetcher(api_url=api_url)
+        self.aircrafts = [Aircraft(i) for i in range(1, 64)]
+        self.tcas = []
 
         self.init()
 
-    def get_all_dataref_specs(self, datarefs) -> dict | None:
-        payload = "&".join([f"filter[name]={path}" for path in datarefs])
-        response = requests.get(BASE_URL, params=payload)
-        resp = response.json()
-        return resp[DATA]
-
     def init(self):
-        all_dataref_descs = self.get_all_dataref_specs(self.TCAS_DATAREFS)
-        self.tcas_datarefs = {d.get(NAME): d.get(IDENT) for d in all_dataref_descs}
-        all_dataref_descs = []
-        for j in range(0, 8):
-            datarefs = []
-            for i in range(j * 8, (j + 1) * 8):
-                if i == 0:
-                    continue
-                a = Aircraft(i)
-                self.aircrafts.append(a)
-                datarefs = datarefs + a.datarefs()
-            all_dataref_descs = all_dataref_descs + self.get_all_dataref_specs(datarefs)
-        self.ac_datarefs = {d.get(NAME): d.get(IDENT) for d in all_dataref_descs}
+        # Resolves all dataref identifiers at once
+        self.fetcher.resolve(self.TCAS_DATAREFS + [d for a in self.aircrafts for d in a.datarefs()])
         print("inited")
 
-    def load_ac(self):
-        for a in self.aircrafts:
-            if a.collect(self.ac_datarefs):
+    def load_ac(self) -> list:
+        """Fetches aircraft properties, returns aircraft that changed.
+
+        Identifying properties (ACBOOT) of all aircraft are fetched first,
+        other properties are only fetched for defined aircraft whose identifying properties changed.
+        """
+        values = self.fetcher.fetch([d for a in self.aircrafts for d in a.datarefs(ACBOOT)])
+        changed = [a for a in self.aircrafts if a.collect(values, ACBOOT)]
+        defined = [a for a in changed if a.defined()]
+        if len(defined) > 0:
+            values = self.fetcher.fetch([d for a in defined for d in a.datarefs(ACUNBOOT)])
+            for a in defined:
+                a.collect(values, ACUNBOOT)
+        for a in changed:
+            if not a.defined():
+                a.collect({}, ACUNBOOT)  # aircraft left, clears other properties
+            else:
                 print(f"{a.index:2d}", a)
+        return changed
 
     def load_tcas(self):
         # collect
-        a = {
-            s: get_dataref_value_by_id(
-                self.tcas_datarefs[s], nullas=" " if s in ["sim/cockpit2/tcas/targets/flight_id", "sim/cockpit2/tcas/targets/icao_type"] else ""
-            )
-            for s in self.TCAS_DATAREFS
-        }
+        a = self.fetcher.fetch(self.TCAS_DATAREFS, nullas={"sim/cockpit2/tcas/targets/flight_id": " ", "sim/cockpit2/tcas/targets/icao_type": " "})
+        if None in a.values():
+            print("TCAS targets not available")
+            return
         # split and reformat
         a["sim/cockpit2/tcas/targets/modeS_id"] = [f"{i:06x}" for i in a["sim/cockpit2/tcas/targets/modeS_id"]]
         a["sim/cockpit2/tcas/targets/flight_id"] = [
@@ -156,10 +144,24 @@ class DatarefCollector:
         used = sorted([str(c) for c in self.tcas if c.defined()])
         print(f"{len(used)} TCAS:\n{'\n'.join(used)}")
 
+    def update(self) -> list:
+        self.load_tcas()
+        return self.load_ac()
+
+    def update_async(self, callback=None):
+        """Collects TCAS and aircraft in the background, callback is called with aircraft that changed.
+        Can be called from a representation, it never waits for the network.
+        """
+        return self.fetcher.submit(self.update, callback=callback)
+
+    def terminate(self):
+        self.fetcher.close()
+
 
-f = DatarefCollector()
-f.load_tcas()
-f.load_ac()
+if __name__ == "__main__":
+    f = DatarefCollector()
+    f.load_tcas()
+    f.load_ac()
 
 # LiveTraffic Attributes:
 #
@@ -0,0 +1,95 @@
+# Cache of loaded fonts
+#
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+FONT_CACHE_MAX_ENTRIES = 256
+
+# First bytes of font files: TrueType, OpenType (CFF), Apple TrueType, TrueType collection
+FONT_SIGNATURES = [b"\x00\x01\x00\x00", b"OTTO", b"true", b"ttcf"]
+
+
+class FontCache:
+    """Process-wide registry of Pillow fonts keyed on (font path, size).
+
+    Fonts are loaded on first use and kept in a least recently used order.
+    When there are more than max_entries fonts, the least recently used fonts are released.
+    Fonts that cannot be loaded are remembered and not tried again.
+    """
+
+    def __init__(self, max_entries: int = FONT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+
+        self._fonts = OrderedDict()  # (path, size): ImageFont.FreeTypeFont
+        self._invalid = set()  # paths that could not be loaded
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, size: int) -> ImageFont.FreeTypeFont | None:
+        """Returns font at path in requested size, None if font cannot be loaded."""
+        key = (path, size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits = self.hits + 1
+                return font
+            if path in self._invalid:
+                return None
+            self.misses = self.misses + 1
+        try:
+            font = ImageFont.truetype(path, size)
+        except:
+            logger.warning(f"font {path} cannot be loaded")
+            with self._lock:
+                self._invalid.add(path)
+            return None
+        with self._lock:
+            self._fonts[key] = font
+            while len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+                self.evictions = self.evictions + 1
+        return font
+
+    @staticmethod
+    def is_font_file(path: str) -> bool:
+        """Checks that the file looks like a font file without loading it."""
+        try:
+            with open(path, "rb") as fp:
+                return fp.read(4) in FONT_SIGNATURES
+        except OSError:
+            return False
+
+    def exists(self, fontname: str) -> bool:
+        """Checks that font file or system font exists. System fonts need to be loaded to be found."""
+        if os.path.isfile(fontname):
+            return FontCache.is_font_file(fontname)
+        return self.get(fontname, 12) is not None
+
+    def clear(self):
+        with self._lock:
+            self._fonts = OrderedDict()
+            self._invalid = set()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._fonts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Process-wide font registry shared by all decks
+FONTS = FontCache()
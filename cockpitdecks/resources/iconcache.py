@@ -0,0 +1,183 @@
+# Persistent cache of decoded icons
+#
+# Replaces the pickle cache of whole PIL images.
+# Decoded RGBA pixels of icons are kept in a binary data file that is memory mapped,
+# with a JSON index of entries, keyed on icon file path, modification time and size.
+#
+#   _icon_cache.idx   {"version": ICON_CACHE_VERSION, "entries": {path: [mtime_ns, size, width, height, offset, length]}}
+#   _icon_cache.bin   RGBA pixels of all entries, back to back
+#
+import logging
+import os
+import io
+import json
+import mmap
+import threading
+
+from PIL import Image
+
+from cockpitdecks.resources.registry import load_image
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+ICON_CACHE_VERSION = 1
+ICON_CACHE_NAME = "_icon_cache"
+ICON_CACHE_INDEX = ICON_CACHE_NAME + ".idx"
+ICON_CACHE_DATA = ICON_CACHE_NAME + ".bin"
+
+MODE = "RGBA"
+
+# Index entry
+MTIME = 0
+SIZE = 1
+WIDTH = 2
+HEIGHT = 3
+OFFSET = 4
+LENGTH = 5
+
+
+class IconCache:
+    """Decoded icons of a folder, stored on disk.
+
+    Icons are read from the memory mapped data file on first use.
+    Icons not in cache, or whose file changed since they were cached, are decoded from their file
+    and added to the cache when it is saved. Only changed icons are decoded again.
+    When more than half of the data file is no longer used, it is rewritten.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.index_path = os.path.join(folder, ICON_CACHE_INDEX)
+        self.data_path = os.path.join(folder, ICON_CACHE_DATA)
+
+        self._entries = {}  # path: index entry
+        self._pending = {}  # path: (index entry, pixels), decoded, not saved yet
+        self._stale = 0  # bytes no longer used in data file
+        self._data = None  # data file, memory mapped
+        self._fp = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+        self.open()
+
+    def open(self):
+        try:
+            with open(self.index_path, "r") as fp:
+                index = json.load(fp)
+            if index.get("version") != ICON_CACHE_VERSION:
+                logger.info(f"icon cache {self.index_path} has version {index.get('version')}, ignored")
+                return
+            self._entries = index.get("entries", {})
+            self._stale = index.get("stale", 0)
+            if os.path.getsize(self.data_path) > 0:
+                self._fp = open(self.data_path, "rb")
+                self._data = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            logger.debug(f"no icon cache in {self.folder}")
+            self._entries = {}
+        except:
+            logger.warning(f"icon cache in {self.folder} cannot be read, ignored", exc_info=True)
+            self._entries = {}
+
+    def close(self):
+        with self._lock:
+            if self._data is not None:
+                self._data.close()
+                self._data = None
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+    @staticmethod
+    def key(path: str) -> tuple:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path: str) -> Image.Image:
+        """Returns icon image in RGBA mode, from cache if it has not changed, decoded from file otherwise.
+
+        Can be used as a loader for ResourceRegistry.
+        """
+        name = os.path.basename(path)
+        mtime, size = IconCache.key(path)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and self._data is not None and entry[MTIME] == mtime and entry[SIZE] == size:
+                self.hits = self.hits + 1
+                pixels = self._data[entry[OFFSET] : entry[OFFSET] + entry[LENGTH]]
+                return Image.frombytes(MODE, (entry[WIDTH], entry[HEIGHT]), pixels)
+            self.misses = self.misses + 1
+        image = load_image(path).convert(MODE)
+        pixels = image.tobytes()
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._stale = self._stale + entry[LENGTH]
+            self._pending[name] = ([mtime, size, image.width, image.height, 0, len(pixels)], pixels)
+        return image
+
+    def save(self):
+        """Adds decoded icons to the cache, compacts the data file if needed."""
+        with self._lock:
+            if len(self._pending) == 0:
+                return
+            pending = self._pending
+            self._pending = {}
+        self.close()
+        try:
+            size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+            if self._stale > size // 2:
+                self.compact(pending)
+            else:
+                with open(self.data_path, "ab") as fp:
+                    for name, (entry, pixels) in pending.items():
+                        entry[OFFSET] = fp.tell()
+                        fp.write(pixels)
+                        self._entries[name] = entry
+            self.write_index()
+            logger.info(f"icon cache {self.folder}: {len(pending)} icons added, {len(self._entries)} icons cached")
+        except OSError:
+            logger.warning(f"icon cache in {self.folder} cannot be saved", exc_info=True)
+        self.open()
+
+    def compact(self, pending: dict):
+        """Rewrites data file with entries in use only."""
+        buffer = io.BytesIO()
+        entries = {}
+        if os.path.exists(self.data_path):
+            with open(self.data_path, "rb") as fp:
+                for name, entry in self._entries.items():
+                    fp.seek(entry[OFFSET])
+                    pixels = fp.read(entry[LENGTH])
+                    entry[OFFSET] = buffer.tell()
+                    buffer.write(pixels)
+                    entries[name] = entry
+        for name, (entry, pixels) in pending.items():
+            entry[OFFSET] = buffer.tell()
+            buffer.write(pixels)
+            entries[name] = entry
+        tmp = self.data_path + ".tmp"
+        with open(tmp, "wb") as fp:
+            fp.write(buffer.getvalue())
+        os.replace(tmp, self.data_path)
+        self._entries = entries
+        self._stale = 0
+        logger.debug(f"icon cache {self.folder} compacted")
+
+    def write_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as fp:
+            json.dump({"version": ICON_CACHE_VERSION, "stale": self._stale, "entries": self._entries}, fp)
+        os.replace(tmp, self.index_path)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,83 @@
+# Cache of rendered button images
+#
+import logging
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+IMAGE_CACHE_MAX_ENTRIES = 2048
+IMAGE_CACHE_MAX_BYTES = 128 * 1024 * 1024  # 128MB, about 500 images 256x256 RGBA
+
+
+class ImageCache:
+    """Bounded least recently used cache of Pillow images.
+
+    Images are stored under a key built from all inputs that have an influence on the image
+    (button, value, texts, colors...). The cache is bounded both in number of entries and in memory.
+    Cached images are shared: callers must copy an image before altering it.
+    """
+
+    def __init__(self, max_entries: int = IMAGE_CACHE_MAX_ENTRIES, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._images = OrderedDict()  # key: (image, size in bytes)
+        self._lock = threading.Lock()
+        self.size = 0  # bytes
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def image_size(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key) -> Image.Image | None:
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is None:
+                self.misses = self.misses + 1
+                return None
+            self._images.move_to_end(key)
+            self.hits = self.hits + 1
+            return entry[0]
+
+    def put(self, key, image: Image.Image):
+        size = ImageCache.image_size(image)
+        if size > self.max_bytes:
+            logger.debug(f"image too large for cache ({size} bytes)")
+            return
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.size = self.size - old[1]
+            self._images[key] = (image, size)
+            self.size = self.size + size
+            while len(self._images) > self.max_entries or self.size > self.max_bytes:
+                _, (_, s) = self._images.popitem(last=False)
+                self.size = self.size - s
+                self.evictions = self.evictions + 1
+
+    def clear(self):
+        with self._lock:
+            self._images = OrderedDict()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._images),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Process-wide cache shared by all decks
+RENDERED_IMAGES = ImageCache()
@@ -26,12 +26,38 @@ class COCKPITDECKS_INTVAR(Enum):
     RENDER_BG_COLOR = "bg-color"
     RENDER_CREATE_ICON = "create_icon"
 
+    # Render scheduler, render requests and effective renders
+    RENDER_REQUESTED = "render_requested"
+    RENDER_FLUSHED = "render_flushed"
+
+    # Rendered image cache
+    IMAGE_CACHE_HITS = "image_cache_hits"
+    IMAGE_CACHE_MISSES = "image_cache_misses"
+    IMAGE_CACHE_EVICTIONS = "image_cache_evictions"
+    IMAGE_CACHE_SIZE = "image_cache_size"  # bytes
+
+    # Animation clock, registered timers and batches called late
+    ANIMATION_TIMERS = "animation_timers"
+    ANIMATION_LATE = "animation_late"
+
+    # Web deck clients, /web_client/<deck-name>/<client-id>/<statistics>
+    WEB_CLIENT = "web_client"
+    WEB_CLIENT_BACKLOG = "backlog"
+    WEB_CLIENT_MAX_BACKLOG = "max_backlog"
+    WEB_CLIENT_SENT = "sent"
+    WEB_CLIENT_COALESCED = "coalesced"
+    WEB_CLIENT_DROPPED = "dropped"
+    WEB_CLIENT_LATENCY = "send_latency"  # ms
+    WEB_CLIENT_LATENCY_MAX = "send_latency_max"  # ms
+
     #
     # P A G E
     #
     DATAREF_REGISTERED = "registered_dataref"
     PAGE_RENDER = "page_render"
     PAGE_CLEAN = "page_clean"
+    PAGE_RELOADS = "page_reload"  # incremental reloads of page file
+    PAGE_RELOADED_BUTTONS = "page_reloaded_buttons"
 
     #
     # B U T T O N
@@ -107,6 +133,14 @@ class COCKPITDECKS_INTVAR(Enum):
     #
     # E V E N T
     #
+    # Cockpit event queue
+    EVENT_QUEUE_DEPTH = "event_queue_depth"
+    EVENT_QUEUE_PRIORITY_DEPTH = "event_queue_priority_depth"
+    EVENT_COALESCED = "event_coalesced"
+    EVENT_DROPPED = "event_dropped"
+    # Average and max time spent in queue (ms), per event class: event_delay/<class-name>[/max]
+    EVENT_DELAY = "event_delay"
+
     ENQUEUE_CYCLE = "cockpitdecks/udp/enqueue/cycle"
 
     ENQUEUE_COUNT = "cockpitdecks/udp/enqueue/count"
@@ -0,0 +1,146 @@
+# Registry of lazily loaded resources
+#
+# Resources (icons, sounds...) are indexed by name at startup, but only read and decoded on first use.
+#
+import logging
+import io
+import threading
+from collections.abc import MutableMapping
+
+from PIL import Image
+from cairosvg import svg2png
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+
+class LazyResource:
+    """A resource file, loaded with loader(path) on first use.
+
+    A resource that cannot be loaded is not tried again.
+    """
+
+    def __init__(self, path: str, loader):
+        self.path = path
+        self.loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def value(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._value = self.loader(self.path)
+                    except:
+                        logger.warning(f"could not load resource {self.path}", exc_info=True)
+                    self._loaded = True
+        return self._value
+
+
+class LoadedResource(LazyResource):
+    """A resource already in memory."""
+
+    def __init__(self, value):
+        LazyResource.__init__(self, path=None, loader=None)
+        self._value = value
+        self._loaded = True
+
+
+class ResourceRegistry(MutableMapping):
+    """Resources indexed by name, values are loaded on first access.
+
+    Registries can be merged with |, like dictionaries. Entries are shared between merged registries,
+    so that a resource loaded through one registry is loaded for all.
+    Resources that cannot be loaded have None value.
+    """
+
+    def __init__(self, loader=None):
+        self.loader = loader
+        self._entries = {}  # name: LazyResource
+
+    def register(self, name: str, path: str, loader=None):
+        """Registers resource file at path, loader overrides default loader of registry."""
+        self._entries[name] = LazyResource(path=path, loader=loader if loader is not None else self.loader)
+
+    def path(self, name: str) -> str | None:
+        entry = self._entries.get(name)
+        return entry.path if entry is not None else None
+
+    def loaded(self) -> int:
+        return len([e for e in self._entries.values() if e.loaded])
+
+    def load_all(self) -> dict:
+        """Loads all resources, returns them in a dictionary."""
+        return {name: entry.value() for name, entry in self._entries.items()}
+
+    def __getitem__(self, name: str):
+        return self._entries[name].value()
+
+    def __setitem__(self, name: str, value):
+        self._entries[name] = value if isinstance(value, LazyResource) else LoadedResource(value)
+
+    def __delitem__(self, name: str):
+        del self._entries[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def copy(self):
+        r = ResourceRegistry(loader=self.loader)
+        r._entries = self._entries.copy()
+        return r
+
+    def __or__(self, other):
+        if not isinstance(other, (dict, ResourceRegistry)):
+            return NotImplemented
+        r = self.copy()
+        r.update_from(other)
+        return r
+
+    def __ror__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        r = ResourceRegistry(loader=self.loader)
+        r.update_from(other)
+        r._entries.update(self._entries)
+        return r
+
+    def update_from(self, other):
+        if isinstance(other, ResourceRegistry):
+            self._entries.update(other._entries)
+            return
+        for name, value in other.items():
+            self[name] = value
+
+    def __repr__(self) -> str:
+        return f"ResourceRegistry({len(self._entries)} entries, {self.loaded()} loaded)"
+
+
+# #########################################################
+# Loaders
+#
+def load_image(path: str) -> Image.Image:
+    """Loads PNG image, or SVG image converted to PNG in memory."""
+    if path.lower().endswith(".svg"):
+        image = Image.open(io.BytesIO(svg2png(url=path)))
+    else:
+        image = Image.open(path)
+    image.load()
+    return image
+
+
+def load_bytes(path: str) -> bytes:
+    with open(path, mode="rb") as file:  # b is important -> binary
+        return file.read()
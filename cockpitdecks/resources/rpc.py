@@ -5,6 +5,109 @@
 # could be used to offer a more "classical" expression writer. Code needs adjustments.
 # This one is soooo simple, so powerful and can easily be extended.
 import math
+import re
+
+
+# Operators work directly on the stack.
+# They are shared by the RPC string calculator and the compiled RPCProgram.
+#
+def _add(stack):
+    stack.append(stack.pop() + stack.pop())
+
+
+def _sub(stack):
+    number2 = stack.pop()
+    stack.append(stack.pop() - number2)
+
+
+def _mul(stack):
+    stack.append(stack.pop() * stack.pop())
+
+
+def _div(stack):
+    number2 = stack.pop()
+    stack.append(stack.pop() / number2)
+
+
+def _mod(stack):
+    number2 = stack.pop()
+    stack.append(stack.pop() % number2)
+
+
+def _floor(stack):
+    stack.append(math.floor(stack.pop()))
+
+
+def _ceil(stack):
+    stack.append(math.ceil(stack.pop()))
+
+
+def _round(stack):  # round to integer
+    stack.append(round(stack.pop(), 0))
+
+
+def _roundn(stack):  # round to n decimals
+    number2 = stack.pop()
+    stack.append(round(stack.pop(), int(number2)))
+
+
+def _abs(stack):  # absolute value
+    stack.append(abs(stack.pop()))
+
+
+def _chs(stack):  # change sign
+    stack.append(-1 * stack.pop())
+
+
+def _eq(stack):  # test for equality, pushes 1 if equal, 0 otherwise
+    stack.append(1 if (stack.pop() == stack.pop()) else 0)
+
+
+def _lt(stack):  # test for <, pushes 1 if <, 0 otherwise
+    stack.append(1 if (stack.pop() < stack.pop()) else 0)
+
+
+def _gt(stack):  # test for >, pushes 1 if >, 0 otherwise
+    stack.append(1 if (stack.pop() < stack.pop()) else 0)
+
+
+def _not(stack):  # pushes 1 if 0, 0 otherwise
+    stack.append(0 if stack.pop() != 0 else 1)
+
+
+def _inf(stack):  # inf is used as a keyword to return a special value
+    stack.append(math.inf)
+
+
+def _cos(stack):  # calculate cosine, input expected in degrees
+    stack.append(math.cos(math.radians(stack.pop())))
+
+
+def _sin(stack):  # calculate sine, input expected in degrees
+    stack.append(math.sin(math.radians(stack.pop())))
+
+
+OPERATORS = {
+    "+": _add,
+    "-": _sub,
+    "*": _mul,
+    "/": _div,
+    "%": _mod,
+    "mod": _mod,
+    "floor": _floor,
+    "ceil": _ceil,
+    "round": _round,
+    "roundn": _roundn,
+    "abs": _abs,
+    "chs": _chs,
+    "eq": _eq,
+    "lt": _lt,
+    "gt": _gt,
+    "not": _not,
+    "inf": _inf,
+    "cos": _cos,
+    "sin": _sin,
+}
 
 
 class RPC:
@@ -28,50 +131,8 @@ class RPC:
         for token in self.tokens:
             if isinstance(token, float):
                 stack.append(token)
-            elif token == "+":
-                stack.append(stack.pop() + stack.pop())
-            elif token == "-":
-                number2 = stack.pop()
-                stack.append(stack.pop() - number2)
-            elif token == "*":
-                stack.append(stack.pop() * stack.pop())
-            elif token == "/":
-                number2 = stack.pop()
-                stack.append(stack.pop() / number2)
-            elif token == "%" or token == "mod":
-                number2 = stack.pop()
-                stack.append(stack.pop() % number2)
-            elif token == "floor":
-                stack.append(math.floor(stack.pop()))
-            elif token == "ceil":
-                stack.append(math.ceil(stack.pop()))
-            elif token == "round":  # round to integer
-                stack.append(round(stack.pop(), 0))
-            elif token == "roundn":  # round to integer
-                number2 = stack.pop()
-                stack.append(round(stack.pop(), int(number2)))
-            elif token == "abs":  # absolute value
-                stack.append(abs(stack.pop()))
-            elif token == "chs":  # change sign
-                stack.append(-1 * stack.pop())
-            elif token == "eq":  # test for equality, pushes 1 if equal, 0 otherwise
-                stack.append(1 if (stack.pop() == stack.pop()) else 0)
-            elif token == "lt":  # test for <, pushes 1 if <, 0 otherwise
-                stack.append(1 if (stack.pop() < stack.pop()) else 0)
-            elif token == "gt":  # test for >, pushes 1 if >, 0 otherwise
-                stack.append(1 if (stack.pop() < stack.pop()) else 0)
-            elif token == "not":  # test for equality, pushes 1 if equal, 0 otherwise
-                stack.append(0 if stack.pop() != 0 else 1)
-            elif token == "inf":  # inf is used as a keyword to return a special value
-                stack.append(math.inf)
-            elif token == "cos":  # calculate cosine, input expected in degrees
-                angle_in_degrees = stack.pop()
-                angle_in_radians = math.radians(angle_in_degrees)
-                stack.append(math.cos(angle_in_radians))
-            elif token == "sin":  # calculate sine, input expected in degrees
-                angle_in_degrees = stack.pop()
-                angle_in_radians = math.radians(angle_in_degrees)
-                stack.append(math.sin(angle_in_radians))
+            elif token in OPERATORS:
+                OPERATORS[token](stack)
             elif isinstance(token, str):
                 print(f"RPC: pushing string {token}")
                 stack.append(token)
@@ -81,6 +142,69 @@ class RPC:
         return stack if return_stack else stack.pop()
 
 
+class RPCProgram:
+    """Reverse polish expression parsed once into a program.
+
+    Variables in the expression, written ${name}, become slots.
+    The program is evaluated with a list of slot values, in the order of the slots list,
+    without substituting values into a string and re-parsing it.
+    Expressions that cannot be compiled, like ${a}${b} or 2${a}, have compiled set to False
+    and must be evaluated through substitution and RPC.
+    """
+
+    CONST = 0
+    SLOT = 1
+    OPERATOR = 2
+    STRING = 3
+
+    VARIABLE = re.compile("^\\${([^\\}]+?)}$")
+
+    def __init__(self, expression):
+        if type(expression) is not str:
+            expression = str(expression)
+
+        self.expression = expression
+        self.slots = []  # variable names, index in list is slot number
+        self.program = []
+        self.compiled = True
+
+        for part in expression.split(" "):
+            m = RPCProgram.VARIABLE.match(part)
+            if m is not None:
+                name = m.group(1)
+                if name not in self.slots:
+                    self.slots.append(name)
+                self.program.append((RPCProgram.SLOT, self.slots.index(name)))
+                continue
+            if "${" in part:  # variable mixed with other characters
+                self.compiled = False
+                self.program = []
+                return
+            try:
+                self.program.append((RPCProgram.CONST, float(part)))
+            except ValueError:
+                if part in OPERATORS:
+                    self.program.append((RPCProgram.OPERATOR, OPERATORS[part]))
+                else:
+                    self.program.append((RPCProgram.STRING, part))
+
+    def calculate(self, values: list, return_stack=False):
+        stack = []
+
+        for kind, arg in self.program:
+            if kind == RPCProgram.CONST:
+                stack.append(arg)
+            elif kind == RPCProgram.SLOT:
+                stack.append(values[arg])
+            elif kind == RPCProgram.OPERATOR:
+                arg(stack)
+            else:
+                print(f"RPC: pushing string {arg}")
+                stack.append(arg)
+
+        return stack if return_stack else stack.pop()
+
+
 class RPC_for_strings:
     # Stack elements should be strings
 
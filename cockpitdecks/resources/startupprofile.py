@@ -0,0 +1,63 @@
+# Startup profile
+#
+# Time spent in each phase of Cockpitdecks startup, reported with --profile-startup.
+#
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+
+class StartupProfile:
+    """Accumulates time spent in named startup phases.
+
+    Phases that occur more than once, like loading each deck, are accumulated and counted.
+    Nothing is recorded unless the profile is enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self._phases = {}  # name: [count, total time]
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.started = time.perf_counter()
+
+    def record(self, name: str, duration: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            phase = self._phases.setdefault(name, [0, 0.0])
+            phase[0] = phase[0] + 1
+            phase[1] = phase[1] + duration
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> str:
+        """Returns the table of phases, in the order they were first entered."""
+        total = time.perf_counter() - self.started
+        width = max([len(n) for n in self._phases] + [len("phase")])
+        lines = [f"{'phase':<{width}}  {'count':>5}  {'time (ms)':>10}"]
+        with self._lock:
+            for name, (count, duration) in self._phases.items():
+                lines.append(f"{name:<{width}}  {count:>5}  {duration * 1000:>10.1f}")
+        lines.append(f"{'total startup':<{width}}  {'':>5}  {total * 1000:>10.1f}")
+        return "\n".join(lines)
+
+
+# Process-wide startup profile
+STARTUP_PROFILE = StartupProfile()
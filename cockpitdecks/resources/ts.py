@@ -1,36 +1,219 @@
 from collections import deque
-from statistics import mean
+from bisect import bisect_right
 
 
 class TimeSerie:
-    def __init__(self, size: int):
+    """Last size multi-column samples, with rolling statistics for each column.
+
+    Statistics are updated when samples are added or removed, so reading them is O(1):
+
+    - average from running sums,
+    - min and max from monotonic deques of (sequence number, value),
+    - exponential moving average, if a smoothing factor alpha is supplied,
+    - rate of change between the last two samples, per second if samples have timestamps, per sample otherwise.
+
+    Running sums are recomputed from samples after size removals, so rounding errors do not accumulate.
+    """
+
+    def __init__(self, size: int, alpha: float | None = None):
         self._elements = deque()
-        self._size = size
+        self._times = deque()
+        self._size = max(1, size)
+        self.alpha = alpha  # EMA smoothing factor, 0 < alpha <= 1, higher is more reactive
+
+        self._first = 0  # sequence number of oldest sample
+        self._next = 0  # sequence number of next sample
+        self._removed = 0  # samples removed since last sums recomputation
+        self._sums = []
+        self._mins = []  # per column, deque of (seq, value) with increasing values
+        self._maxs = []  # per column, deque of (seq, value) with decreasing values
+        self._ema = None
+        self._rate = None
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def _columns(self, count: int):
+        if len(self._sums) == count:
+            return
+        if len(self._elements) > 0:
+            raise ValueError(f"sample has {count} columns, time serie has {len(self._sums)}")
+        self._sums = [0.0] * count
+        self._mins = [deque() for i in range(count)]
+        self._maxs = [deque() for i in range(count)]
+        self._ema = None
+        self._rate = None
+
+    def enqueue(self, element, timestamp: float | None = None):
+        self._columns(len(element))
+        seq = self._next
+        self._next = self._next + 1
+        for i, v in enumerate(element):
+            self._sums[i] = self._sums[i] + v
+            q = self._mins[i]
+            while len(q) > 0 and q[-1][1] >= v:
+                q.pop()
+            q.append((seq, v))
+            q = self._maxs[i]
+            while len(q) > 0 and q[-1][1] <= v:
+                q.pop()
+            q.append((seq, v))
+
+        if len(self._elements) > 0:
+            dt = 1
+            if timestamp is not None and self._times[-1] is not None:
+                dt = timestamp - self._times[-1]
+            if dt > 0:
+                self._rate = [(v - p) / dt for v, p in zip(element, self._elements[-1])]
+        if self.alpha is not None:
+            if self._ema is None:
+                self._ema = list(element)
+            else:
+                self._ema = [e + self.alpha * (v - e) for e, v in zip(self._ema, element)]
 
-    def enqueue(self, element):
         self._elements.append(element)
-        toobig = len(self._elements)
-        while toobig > self._size:
+        self._times.append(timestamp)
+        if len(self._elements) > self._size:
             self.dequeue()
-            toobig = len(self._elements)
 
     def dequeue(self):
-        return self._elements.popleft()
+        element = self._elements.popleft()
+        self._times.popleft()
+        seq = self._first
+        self._first = self._first + 1
+        for i, v in enumerate(element):
+            self._sums[i] = self._sums[i] - v
+            if self._mins[i][0][0] == seq:
+                self._mins[i].popleft()
+            if self._maxs[i][0][0] == seq:
+                self._maxs[i].popleft()
+        self._removed = self._removed + 1
+        if self._removed >= self._size or len(self._elements) == 0:
+            self._sums = [sum([v[i] for v in self._elements]) for i in range(len(self._sums))]
+            self._removed = 0
+        return element
 
-    def _fun(self, func):
+    def max(self):
         if len(self._elements) > 0:
-            e = self._elements[0]
-            return [func([v[i] for v in self._elements]) for i in range(len(e))]
+            return [q[0][1] for q in self._maxs]
         return None
 
-    def max(self):
-        return self._fun(max)
-
     def min(self):
-        return self._fun(min)
+        if len(self._elements) > 0:
+            return [q[0][1] for q in self._mins]
+        return None
 
     def average(self):
-        return self._fun(mean)
+        if len(self._elements) > 0:
+            return [s / len(self._elements) for s in self._sums]
+        return None
+
+    def ema(self):
+        """Exponential moving average, None if no smoothing factor or no sample."""
+        return list(self._ema) if self._ema is not None else None
+
+    def rate(self):
+        """Rate of change between the last two samples, None if less than two samples."""
+        return list(self._rate) if self._rate is not None else None
+
+
+class TimeRingBuffer:
+    """Fixed capacity buffer of (value, timestamp) samples, ordered by timestamp.
+
+    Samples are stored in preallocated circular lists.
+    Appending a sample in time order and dropping oldest samples are O(1).
+    When the buffer is full, the oldest sample is dropped.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._values = [None] * self.capacity
+        self._times = [0.0] * self.capacity
+        self._head = 0  # index of oldest sample
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, i: int) -> int:
+        return (self._head + i) % self.capacity
+
+    def __getitem__(self, i: int) -> tuple:
+        if i < 0:
+            i = self._count + i
+        if i < 0 or i >= self._count:
+            raise IndexError("ring buffer index out of range")
+        j = self._index(i)
+        return self._values[j], self._times[j]
+
+    def __iter__(self):
+        for i in range(self._count):
+            j = self._index(i)
+            yield self._values[j], self._times[j]
+
+    def last_time(self) -> float | None:
+        return self._times[self._index(self._count - 1)] if self._count > 0 else None
+
+    def append(self, value, timestamp: float) -> tuple | None:
+        """Adds sample, returns oldest sample if it was dropped to make room, None otherwise.
+
+        Samples older than the last one are inserted at their place.
+        When the buffer is full, a sample older than all samples is not added and is returned as dropped.
+        """
+        dropped = None
+        if self._count == self.capacity:
+            if timestamp < self._times[self._head]:
+                return value, timestamp
+            dropped = self.popleft()
+        last = self.last_time()
+        if last is None or timestamp >= last:
+            j = self._index(self._count)
+            self._values[j] = value
+            self._times[j] = timestamp
+            self._count = self._count + 1
+            return dropped
+        # Out of order sample, rare
+        samples = list(self)
+        samples.insert(bisect_right([s[1] for s in samples], timestamp), (value, timestamp))
+        self.clear()
+        for v, t in samples:
+            self.append(v, t)
+        return dropped
+
+    def popleft(self) -> tuple:
+        if self._count == 0:
+            raise IndexError("pop from empty ring buffer")
+        sample = self._values[self._head], self._times[self._head]
+        self._values[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._count = self._count - 1
+        return sample
+
+    def drop_before(self, timestamp: float) -> int:
+        """Drops samples older than or at timestamp, returns number of samples dropped."""
+        n = 0
+        while self._count > 0 and self._times[self._head] <= timestamp:
+            self.popleft()
+            n = n + 1
+        return n
+
+    def since(self, timestamp: float | None, before: int = 0) -> list:
+        """Returns samples more recent than timestamp, preceded by up to before older samples.
+
+        Cost is proportional to the number of samples returned.
+        """
+        if timestamp is None:
+            return list(self)
+        i = self._count
+        while i > 0 and self._times[self._index(i - 1)] > timestamp:
+            i = i - 1
+        return [self[k] for k in range(max(0, i - before), self._count)]
+
+    def clear(self):
+        self._values = [None] * self.capacity
+        self._times = [0.0] * self.capacity
+        self._head = 0
+        self._count = 0
 
 
 # a = TimeSerie(2)
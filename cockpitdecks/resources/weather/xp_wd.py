@@ -3,6 +3,7 @@
 # Attempts to build a METAR from X-Plane weather datarefs
 #
 # Note: This file is independent from Cockpitdecks (hence it's few hardcoded values)
+#       except for the dataref fetcher it shares with other REST API collectors.
 #       It also requests 2 specific packages (tabulate for debugging) and requests.
 #
 # Script contains a __main__ section to test it in place.
@@ -20,11 +21,12 @@ from typing import List
 from datetime import datetime, timezone
 
 from tabulate import tabulate
-import requests
 
 from metar import Metar
 from avwx import Station
 
+from cockpitdecks.resources.datareffetcher import DatarefFetcher
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("make_metar")
 logger.setLevel(logging.INFO)
@@ -326,9 +328,15 @@ class XPWeatherData:
         self.weather: Weather | None = None
         self.wind_layers: List[WindLayer] = []  #  Defined wind layers. Not all layers are always defined. up to 13 layers(!)
         self.cloud_layers: List[CloudLayer] = []  #  Defined cloud layers. Not all layers are always defined. up to 3 layers
+        self.fetcher = DatarefFetcher(api_url=api_url)
 
         self.update_weather(update=update)
 
+    def close(self):
+        # Releases worker threads and HTTP connections of the fetcher.
+        # Must be called by the owner when the weather data is no longer updated.
+        self.fetcher.close()
+
     @property
     def cache_filename(self) -> str:
         s = self.station.icao if self.station is not None else "ICAO"
@@ -378,49 +386,13 @@ class XPWeatherData:
             else:
                 logger.warning("weather file not found")
 
-        DATA = "data"
-        IDENT = "id"
-
-        def get_dataref_specs(path: str) -> dict | None:
-            api_url = self.api_url
-            payload = {"filter[name]": path}
-            response = requests.get(api_url, params=payload)
-            resp = response.json()
-            if DATA in resp:
-                return resp[DATA][0]
-            logger.error(resp)
-            return None
-
-        def get_dataref_id(path: str) -> int | None:
-            specs = get_dataref_specs(path)
-            if specs is not None and IDENT in specs:
-                return specs[IDENT]
-            logger.error(specs)
-            return None
-
-        def get_dataref_value(path: str):
-            dref = get_dataref_specs(path)
-            if dref is None or IDENT not in dref:
-                logger.error(f"error for {path}")
-                return None
-            url = f"{self.api_url}/{dref[IDENT]}/value"
-            response = requests.get(url)
-            data = response.json()
-            if DATA in data:
-                return data[DATA]
-            logger.error(f"no value for {path}")
-            return None
-
         WEATHER_DATAFEFS = AIRCRAFT_DATAREFS if self.weather_type == WEATHER_LOCATION.AIRCRAFT.value else REGION_DATAREFS
         if position_only:
             WEATHER_DATAFEFS = DATAREF_LOCATION
 
         logger.info(f"collecting {self.weather_type} weather datarefs..")
-        weather_datarefs = {}
-        for d in WEATHER_DATAFEFS.values():
-            v = get_dataref_value(d)
-            weather_datarefs[d] = v
-            logger.debug(f"{d}={v}")
+        weather_datarefs = self.fetcher.fetch(list(WEATHER_DATAFEFS.values()))
+        logger.debug(f"{weather_datarefs}")
         logger.info(f"..collected {len(weather_datarefs)} datarefs")
 
         # flatten arrays
@@ -451,7 +423,7 @@ class XPWeatherData:
         if self.station is None:
             logger.info("no station")
             return True
-        position = self.collect_weather_datarefs(position_only=True)
+        position = self.fetcher.fetch(list(DATAREF_LOCATION.values()))  # no need to collect weather nor to save it
         here = (position["sim/flightmodel/position/latitude"], position["sim/flightmodel/position/longitude"])
         station = (self.station.latitude, self.station.longitude)
         dist = distance(station, here)
@@ -994,3 +966,4 @@ if __name__ == "__main__":
     print("\n".join(w.get_metar_lines()))
 
     # w.update()
+    w.close()
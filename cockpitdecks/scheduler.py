@@ -0,0 +1,243 @@
+# Schedulers for deck rendering
+#
+import logging
+import threading
+import itertools
+import heapq
+import math
+import time
+
+from cockpitdecks import DEFAULT_MAX_FPS
+from cockpitdecks.resources.intvariables import COCKPITDECKS_INTVAR
+
+logger = logging.getLogger(__name__)
+# logger.setLevel(logging.DEBUG)
+
+
+class RenderScheduler:
+    """Renders buttons of a deck at most max_fps times per second.
+
+    Buttons requesting a render are marked dirty.
+    A ticker thread flushes dirty buttons once per frame,
+    each dirty button is rendered once, whatever the number of render requests it received during the frame.
+    The ticker thread sleeps when there is nothing to render.
+    """
+
+    def __init__(self, deck, max_fps: float = DEFAULT_MAX_FPS):
+        self.deck = deck
+        self.max_fps = max_fps
+        self.frame = 1.0 / max_fps
+
+        self._dirty = {}  # id(button): button, insertion ordered
+        self._requests = 0  # since last flush
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._last_flush = 0.0
+
+        self.running = False
+        self.thread = None
+
+        # Statistics
+        self.requested = 0
+        self.rendered = 0
+
+    def mark_dirty(self, button):
+        with self._lock:
+            self._dirty[id(button)] = button
+            self._requests = self._requests + 1
+        self._wakeup.set()
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self.loop, name=f"RenderScheduler::loop({self.deck.name})", daemon=True)
+            self.thread.start()
+            logger.debug(f"deck {self.deck.name}: render scheduler started ({self.max_fps} fps)")
+        else:
+            logger.warning(f"deck {self.deck.name}: render scheduler already running")
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            self._wakeup.set()
+            if self.thread is not None and self.thread is not threading.current_thread():
+                self.thread.join(timeout=2 * self.frame)
+                if self.thread.is_alive():
+                    logger.warning(f"deck {self.deck.name}: ..render scheduler thread may hang..")
+            with self._lock:
+                self._dirty = {}
+            logger.debug(f"deck {self.deck.name}: render scheduler stopped")
+        else:
+            logger.debug(f"deck {self.deck.name}: render scheduler not running")
+
+    def loop(self):
+        while self.running:
+            self._wakeup.wait()
+            if not self.running:
+                break
+            wait = self._last_flush + self.frame - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)  # more requests get collected while waiting for next frame
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._wakeup.clear()
+            dirty = self._dirty
+            self._dirty = {}
+            requests = self._requests
+            self._requests = 0
+        self._last_flush = time.monotonic()
+        if len(dirty) == 0:
+            return
+        for button in dirty.values():
+            button.render_now()
+        self.requested = self.requested + requests
+        self.rendered = self.rendered + len(dirty)
+        self.deck.inc(COCKPITDECKS_INTVAR.RENDER_REQUESTED.value, amount=requests)
+        self.deck.inc(COCKPITDECKS_INTVAR.RENDER_FLUSHED.value, amount=len(dirty))
+
+
+class ClockTimer:
+    """A callback registered with the animation clock, called every interval seconds."""
+
+    def __init__(self, name: str, interval: float, callback, due: float):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.due = due
+        self.active = True
+
+    def next_due(self, now: float):
+        # Next tick after now, skips missed ticks so that timer stays on its phase.
+        self.due = self.due + self.interval
+        if self.due <= now:
+            self.due = self.due + math.ceil((now - self.due) / self.interval) * self.interval
+            if self.due <= now:
+                self.due = self.due + self.interval
+
+
+class AnimationClock:
+    """Single clock that drives all periodic activities of the cockpit (animations, blinkers, data collection...).
+
+    Callbacks are registered with an interval.
+    Aligned timers tick on multiples of their interval counted from a common origin,
+    so that two blinkers with the same speed flash together, whatever deck they are on and whenever they started.
+    All callbacks due at the same time are called in a single batch from the clock thread,
+    the render requests they issue are collected in the same frame by the deck render schedulers.
+    Callbacks must return quickly; a long callback delays all other timers.
+    """
+
+    def __init__(self, name: str = "Cockpit"):
+        self.name = name
+
+        self._timers = []  # heap of (due, seq, timer)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._origin = time.monotonic()
+
+        self.running = False
+        self.thread = None
+
+        # Statistics
+        self.ticks = 0  # batches
+        self.calls = 0  # callbacks
+        self.late = 0  # batches called more than one frame late
+
+    def register(self, interval: float, callback, name: str = "timer", delay: float | None = None) -> ClockTimer | None:
+        """Registers callback to be called every interval seconds.
+
+        Without delay, first tick occurs at next multiple of interval (phase aligned).
+        With a delay, first tick occurs after delay, following ticks every interval after the first one.
+        Returns the timer, to be supplied to unregister().
+        """
+        if interval is None or interval <= 0:
+            logger.warning(f"{name}: invalid interval {interval}, not registered")
+            return None
+        now = time.monotonic()
+        if delay is None:
+            due = self._origin + (math.floor((now - self._origin) / interval) + 1) * interval
+        else:
+            due = now + delay
+        timer = ClockTimer(name=name, interval=interval, callback=callback, due=due)
+        with self._cond:
+            heapq.heappush(self._timers, (timer.due, next(self._seq), timer))
+            self._cond.notify()
+        if not self.running:
+            self.start()
+        logger.debug(f"{name}: registered every {interval} secs")
+        return timer
+
+    def unregister(self, timer: ClockTimer | None):
+        """Stops calling the timer callback. Can be called from within the callback."""
+        if timer is None:
+            return
+        timer.active = False  # removed from heap when due
+        logger.debug(f"{timer.name}: unregistered")
+
+    def count(self) -> int:
+        return len([t for _, _, t in self._timers if t.active])
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self.loop, name=f"{self.name}::Animation Clock", daemon=True)
+        self.thread.start()
+        logger.debug("animation clock started")
+
+    def stop(self):
+        if self.running:
+            with self._cond:
+                self.running = False
+                self._timers = []
+                self._cond.notify()
+            if self.thread is not None and self.thread is not threading.current_thread():
+                self.thread.join(timeout=1.0)
+                if self.thread.is_alive():
+                    logger.warning("..animation clock thread may hang..")
+            self.thread = None
+            logger.debug("animation clock stopped")
+        else:
+            logger.debug("animation clock not running")
+
+    def loop(self):
+        while self.running:
+            with self._cond:
+                while self.running and (len(self._timers) == 0 or self._timers[0][0] > time.monotonic()):
+                    self._cond.wait(timeout=self._timers[0][0] - time.monotonic() if len(self._timers) > 0 else None)
+                if not self.running:
+                    break
+                now = time.monotonic()
+                batch = []
+                earliest = now
+                while len(self._timers) > 0 and self._timers[0][0] <= now:
+                    due, _, timer = heapq.heappop(self._timers)
+                    if not timer.active:
+                        continue
+                    batch.append(timer)
+                    earliest = min(earliest, due)
+                    timer.next_due(now)
+                    heapq.heappush(self._timers, (timer.due, next(self._seq), timer))
+            if len(batch) == 0:
+                continue
+            if now - earliest > 1.0 / DEFAULT_MAX_FPS:
+                self.late = self.late + 1
+            self.ticks = self.ticks + 1
+            for timer in batch:
+                if not timer.active:  # unregistered by a previous callback in batch
+                    continue
+                try:
+                    timer.callback()
+                except:
+                    logger.warning(f"{timer.name}: callback failed", exc_info=True)
+                self.calls = self.calls + 1
+
+    def stats(self) -> dict:
+        return {
+            "timers": self.count(),
+            "ticks": self.ticks,
+            "calls": self.calls,
+            "late": self.late,
+        }
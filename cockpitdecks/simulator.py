@@ -260,6 +260,12 @@ class Simulator(ABC, InstructionFactory, InstructionPerformer, VariableFactory,
         data = self.get_variable(name=name)
         data.update_value(new_value=value, cascade=cascade)
 
+    def set_simulator_variables(self, values: dict, cascade: bool = True) -> int:
+        """Sets the values of many simulator variables at once, for example all values received in a simulator frame.
+        Listeners are notified after all values are set. Unknown variables are ignored.
+        Returns number of variables that changed."""
+        return self.cockpit.variable_database.update_many(names=list(values.keys()), values=list(values.values()), cascade=cascade)
+
     def inc_internal_variable(self, name: str, amount: float, cascade: bool = False):
         """Incretement an InternalVariable
         Args:
@@ -607,6 +613,11 @@ class SimulatorVariableEvent(SimulatorEvent):
     def __str__(self):
         return f"{self.sim.name}:{self.name}={self.value}:{self.timestamp}"
 
+    @property
+    def coalesce_key(self) -> str | None:
+        """Only the latest pending value of a variable is applied"""
+        return self.name
+
     def info(self):
         return super().info() | {"path": self.name, "value": self.value, "cascade": self.cascade}
 
@@ -634,6 +645,45 @@ class SimulatorVariableEvent(SimulatorEvent):
         return True
 
 
+class SimulatorVariablesEvent(SimulatorEvent):
+    """Update Event for many variables at once, usually all values received in a simulator frame"""
+
+    def __init__(self, sim: Simulator, values: dict, cascade: bool, autorun: bool = True):
+        """Variables Update Event.
+
+        Args:
+            values (dict): {variable name: value}
+        """
+        self.values = values
+        self.cascade = cascade
+        SimulatorEvent.__init__(self, sim=sim, autorun=autorun)
+
+    def __str__(self):
+        return f"{self.sim.name}:{len(self.values)} variables:{self.timestamp}"
+
+    def info(self):
+        return super().info() | {"values": self.values, "cascade": self.cascade}
+
+    def run(self, just_do_it: bool = False) -> bool:
+        if just_do_it:
+            if self.sim is None:
+                logger.warning("no simulator")
+                return False
+            try:
+                logger.debug(f"updating {len(self.values)} variables..")
+                self.handling()
+                self.sim.set_simulator_variables(values=self.values, cascade=self.cascade)
+                self.handled()
+                logger.debug("..updated")
+            except:
+                logger.warning(f"..updated with error ({len(self.values)} variables ({self.cascade}))", exc_info=True)
+                return False
+        else:
+            self.enqueue()
+            logger.debug("enqueued")
+        return True
+
+
 class SimulatorVariableValueProvider(ABC, ValueProvider):
     def __init__(self, name: str, simulator: Simulator):
         ValueProvider.__init__(self, name=name, provider=simulator)
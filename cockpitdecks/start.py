@@ -38,6 +38,7 @@ from cockpitdecks import __NAME__, __version__, __COPYRIGHT__, __DESCRIPTION__,
 from cockpitdecks.constant import CONFIG_FOLDER, RESOURCES_FOLDER, DESIGNER_CONFIG_FILE
 from cockpitdecks.constant import ENVIRON_KW, CONFIG_KW, DECK_KW, DECKS_FOLDER, DECK_TYPES, TEMPLATE_FOLDER, ASSET_FOLDER, AUTOSAVE_FILE
 from cockpitdecks.cockpit import Cockpit
+from cockpitdecks.resources.startupprofile import STARTUP_PROFILE
 from cockpitdecks.aircraft import DECK_TYPE_DESCRIPTION
 
 
@@ -165,11 +166,16 @@ parser.add_argument(
     "--template", metavar="aircraft folder", type=str, nargs=1, help="create deckconfig and add template files to start in supplied aircraft folder"
 )
 parser.add_argument("--designer", action="store_true", help="start designer")
+parser.add_argument("--asgi", action="store_true", help="serve web decks with asynchronous application server (requires uvicorn and asgiref)")
+parser.add_argument("--profile-startup", action="store_true", help="print time spent in each startup phase")
 # parser.add_argument("--install-plugin", action="store_true", help="install Cockpitdecks plugin in X-Plane/XPPython3")
 parser.add_argument("aircraft_folder", metavar="aircraft_folder", type=str, nargs="?", help="aircraft folder for non automatic start")
 
 args = parser.parse_args()
 
+if args.profile_startup:
+    STARTUP_PROFILE.enable()
+
 if args.verbose:
     startup_logger.setLevel(logging.DEBUG)
     startup_logger.debug(f"{os.path.basename(sys.argv[0])} {__version__} configuring startup..")
@@ -688,21 +694,13 @@ def cockpit_wshandler():
             code = data.get(CODE)
             if code == 1:
                 deck = data.get("deck")
-                cockpit.register_deck(deck, ws)
+                cockpit.register_deck(deck, ws, formats=data.get("formats"))
                 # app.logger.info(f"registered deck {deck}")
                 cockpit.handle_code(code, deck)
                 app.logger.debug(f"handled deck={deck}, code={code}")
             elif code == 0 or code == 99:  # 99 is replay
-                deck = data.get("deck")
-                if deck is None:  # sim event
-                    cockpit.replay_sim_event(data=data)
-                    # app.logger.info(f"event processed, data={data}")
-                else:
-                    key = data.get("key")
-                    event = data.get("event")
-                    payload = data.get("data")
-                    cockpit.process_event(deck_name=deck, key=key, event=event, data=payload, replay=code == 99)
-                # app.logger.info(f"event processed deck={deck}, event={event} data={payload}")
+                cockpit.handle_web_event(data=data)
+                # app.logger.info(f"event processed, data={data}")
     except ConnectionClosed:
         app.logger.debug("connection closed")
         cockpit.remove_client(ws)
@@ -726,6 +724,8 @@ def main():
             )
         cockpit.start_aircraft(acpath=AIRCRAFT_HOME, release=args.designer, mode=mode.value)
         logger.info(f"..{AIRCRAFT_DESC} running..")
+        if args.profile_startup:
+            print(f"Startup profile\n{STARTUP_PROFILE.report()}")
         if cockpit.has_web_decks() or (len(cockpit.get_deck_background_images()) > 0 and args.designer):
             if not cockpit.has_web_decks():
                 logger.warning("no web deck, starting application server for designer")
@@ -735,7 +735,16 @@ def main():
                 url = f"http://{APP_HOST[0]}:{APP_HOST[1]}"
                 logger.info(f"..opening browser window ({url})..")
                 webbrowser.open(url)
-            app.run(host="0.0.0.0", port=APP_HOST[1])
+            serve = None
+            if args.asgi:
+                try:
+                    from cockpitdecks.asgi import serve
+                except ModuleNotFoundError:
+                    logger.warning("asynchronous application server requires packages uvicorn and asgiref (pip install 'cockpitdecks[asgi]')")
+            if serve is not None:
+                serve(app=app, cockpit=cockpit, host="0.0.0.0", port=APP_HOST[1])
+            else:
+                app.run(host="0.0.0.0", port=APP_HOST[1])
         else:
             logger.warning("no web deck, no request for designer")
 
@@ -13,7 +13,7 @@ from cockpitdecks.variable import Variable, VariableListener, PATTERN_DOLCB
 # from cockpitdecks.button.activation import ActivationValueProvider
 # from cockpitdecks.simulator import SimulatorVariableValueProvider
 
-from .resources.rpc import RPC
+from .resources.rpc import RPC, RPCProgram
 from .resources.color import convert_color
 from .resources.iconfonts import ICON_FONTS
 
@@ -34,6 +34,7 @@ class StringWithVariables(Variable, VariableListener):
     """
 
     MESSAGE_NS = uuid.uuid4()
+    NOTIFY_ONCE_PER_BATCH = True  # value is reevaluated from all variables
 
     @staticmethod
     def mk_uuid(message: str):
@@ -53,6 +54,7 @@ class StringWithVariables(Variable, VariableListener):
         self._tokens = {}  # "${path}": path
         self._string_variables = None
         self._variables = None
+        self._variable_refs = {}  # path: Variable, variables bound at init()
         self._formats = {}  # for later @todo
 
         self.init()
@@ -65,6 +67,7 @@ class StringWithVariables(Variable, VariableListener):
                 if not Variable.is_state_variable(varname):
                     v = self.owner.get_variable(varname)
                     v.add_listener(self)
+                    self._variable_refs[varname] = v
             # owner get notified when this string changes
         if isinstance(self.owner, VariableListener):
             self.add_listener(self.owner)
@@ -338,6 +341,7 @@ class Formula(StringWithVariables):
     """
 
     FORMULA_NS = uuid.uuid4()
+    COMPILED = True  # formula parsed once into a RPCProgram, evaluated without string substitution
 
     @staticmethod
     def mk_uuid(message: str):
@@ -350,6 +354,11 @@ class Formula(StringWithVariables):
 
         self.default_value = default_value
         self.format_str = format_str
+
+        self._program = None
+        self._getters = []
+        if Formula.COMPILED:
+            self.compile()
         # print("+++++ CREATED FORMULA", self.name, self.owner.name, formula, self.get_variables())
 
     @property
@@ -386,21 +395,80 @@ class Formula(StringWithVariables):
     def get_formatted_value(self) -> str:
         return self.format_value(self.value)
 
+    def compile(self) -> bool:
+        """Parses the formula once into a RPCProgram.
+
+        Each variable slot of the program is bound to a value getter: Variable objects
+        for internal and simulator variables, owner for state variables and ${formula}.
+        If the formula cannot be compiled, it is evaluated by string substitution.
+
+        Returns:
+            bool: [whether formula was compiled]
+        """
+        self._program = None
+        if self.message is None or type(self.message) is not str:
+            return False
+        if len([t for t in self._tokens if not t.startswith("${")]) > 0:  # single variable without ${}
+            return False
+        program = RPCProgram(self.message)
+        if not program.compiled:
+            logger.debug(f"formula {self.display_name}: cannot compile {self.formula}, using string substitution")
+            return False
+        self._getters = [self._slot_getter(name) for name in program.slots]
+        self._program = program
+        logger.debug(f"formula {self.display_name}: compiled {self.formula} ({len(program.slots)} slots)")
+        return True
+
+    def _slot_getter(self, varname: str):
+        # Returns a function that returns the raw value of a variable, None if no value
+        if varname == CONFIG_KW.FORMULA.value:
+            return lambda: self.get_formula_result(default=None)
+        if Variable.is_state_variable(varname):
+            return lambda: self.get_state_variable_value(varname, default=None)
+        variable = self._variable_refs.get(varname)
+        if variable is not None and (Variable.is_internal_variable(varname) or Variable.may_be_non_internal_variable(varname)):
+            return lambda: variable.value
+        return lambda: None
+
+    def _slot_values(self, default: str = "0.0") -> list | None:
+        # Returns slot values as they would be parsed after string substitution, None if a value is not a number
+        values = []
+        for getter in self._getters:
+            value = getter()
+            if value is None:
+                value = default
+            if type(value) is float:
+                values.append(value)
+                continue
+            value = str(value)
+            if " " in value:  # would be split into several tokens
+                return None
+            try:
+                values.append(float(value))
+            except ValueError:
+                return None
+        return values
+
     def execute_formula(self, store: bool = False, cascade: bool = False):
         """replace datarefs variables with their value and execute formula.
 
         Returns:
             [type]: [formula result]
         """
-        expr = self.substitute_values()
-        logger.debug(f"formula {self.display_name}: {self.formula} => {expr}")
-        r = RPC(expr)
-        # if self.data_type == "string":
-        #     r = RPC_for_strings(expr)
-        # else:
-        #     r = RPC(expr)
-        value = r.calculate()
-        logger.debug(f"value {self.display_name}: {self.formula} => {expr} => {value}")
+        values = self._slot_values() if self._program is not None else None
+        if values is not None:
+            value = self._program.calculate(values)
+            logger.debug(f"value {self.display_name}: {self.formula} => {values} => {value}")
+        else:
+            expr = self.substitute_values()
+            logger.debug(f"formula {self.display_name}: {self.formula} => {expr}")
+            r = RPC(expr)
+            # if self.data_type == "string":
+            #     r = RPC_for_strings(expr)
+            # else:
+            #     r = RPC(expr)
+            value = r.calculate()
+            logger.debug(f"value {self.display_name}: {self.formula} => {expr} => {value}")
         valueout = value
         if self.is_string:
             valueout = self.format_value(value)
@@ -2,6 +2,7 @@
 #
 from __future__ import annotations
 import logging
+from datetime import datetime
 from enum import Enum
 from abc import ABC, abstractmethod
 from typing import Dict, Any
@@ -197,8 +198,9 @@ class Variable(ABC):
     def value(self, value):
         self.current_value = value
 
-    def update_value(self, new_value, cascade: bool = False) -> bool:
+    def update_value(self, new_value, cascade: bool = False, ts: datetime | None = None) -> bool:
         # returns whether has changed
+        # ts is the time of the update, supplied when many variables are updated at once
         def local_round(val):
             return round(val, self._round) if self._round is not None and type(val) in [int, float] else val
 
@@ -217,12 +219,14 @@ class Variable(ABC):
                 self.current_value = local_round_arr(new_value)
             else:
                 self.current_value = new_value
+        if ts is None:
+            ts = now()
         self._updated = self._updated + 1
-        self._last_updated = now()
+        self._last_updated = ts
         # self.notify_updated()
         if self.has_changed():
             self._changed = self._changed + 1
-            self._last_changed = now()
+            self._last_changed = ts
             logger.log(
                 SPAM_LEVEL,
                 f"variable {self.name} updated {self.previous_value} -> {self.current_value}",
@@ -292,6 +296,11 @@ class VariableListener(ABC):
     when a data changes.
     """
 
+    # When many variables are updated at once (VariableDatabase.update_many),
+    # a listener that reevaluates itself from all its variables, whichever changed,
+    # only needs to be notified once.
+    NOTIFY_ONCE_PER_BATCH = False
+
     def __init__(self, name: str = "abstract-data-listener"):
         self.vl_name = name
 
@@ -337,16 +346,33 @@ class InternalVariableValueProvider(ABC, ValueProvider):
         pass
 
 
+class VariableKind(Enum):
+    INTERNAL = "data"
+    SIMULATOR = "simulator"
+    OTHER = "other"
+
+
 class VariableDatabase:
     """Container for all variables.
 
     In the past, it was stored into the simulator.
     It is now stored in the Cockpit and caontains both Simulator and Internal variables.
 
+    Variables are also indexed by kind (internal, simulator, other)
+    to access all variables of a kind without scanning the whole database.
     """
 
     def __init__(self) -> None:
         self.database: Dict[str, Variable] = {}
+        self.index: Dict[VariableKind, Dict[str, Variable]] = {k: {} for k in VariableKind}
+
+    @staticmethod
+    def variable_kind(name: str) -> VariableKind:
+        if Variable.is_internal_variable(name):
+            return VariableKind.INTERNAL
+        if Variable.may_be_non_internal_variable(name):
+            return VariableKind.SIMULATOR
+        return VariableKind.OTHER
 
     def register(self, variable: Variable) -> Variable:
         if variable.name is None:
@@ -357,6 +383,7 @@ class VariableDatabase:
             return variable
         if variable.name not in self.database:
             self.database[variable.name] = variable
+            self.index[VariableDatabase.variable_kind(variable.name)][variable.name] = variable
         else:
             logger.debug(f"variable {variable.name} already registered")
         return variable
@@ -369,6 +396,9 @@ class VariableDatabase:
             logger.debug(f"variable {name} not found")
         return self.database.get(name)
 
+    def get_variables(self, kind: VariableKind) -> list:
+        return list(self.index[kind].values())
+
     def value_of(self, name: str, default: Any = None) -> Any | None:
         v = self.get(name)
         if v is None:
@@ -383,12 +413,44 @@ class VariableDatabase:
                 logger.debug(f"{k} = {self.value_of(k)}")
 
     def remove_all_simulator_variables(self):
-        to_delete = []
-        for d in self.database:
-            if Variable.may_be_non_internal_variable(d):  # type(variable) is Dataref
-                to_delete.append(d)
-        for d in to_delete:
-            self.database.pop(d)
+        for d in self.index[VariableKind.SIMULATOR]:
+            self.database.pop(d, None)
+        self.index[VariableKind.SIMULATOR] = {}
+
+    def update_many(self, names: list, values: list, cascade: bool = True) -> int:
+        """Updates many variables at once, for example all variables received in a simulator frame.
+
+        All variables get the same update time. Listeners are notified after all variables are updated.
+        Listeners that reevaluate themselves from all their variables (NOTIFY_ONCE_PER_BATCH)
+        are notified once, other listeners are notified once per changed variable they listen to.
+
+        Returns number of variables that changed.
+        """
+        ts = now()
+        changed = 0
+        once = {}  # id(listener): (listener, last changed variable), ordered by first notification
+        each = []  # (listener, variable)
+        for name, value in zip(names, values):
+            variable = self.database.get(name)
+            if variable is None:
+                logger.debug(f"variable {name} not found")
+                continue
+            if not variable.update_value(value, cascade=False, ts=ts):
+                continue
+            changed = changed + 1
+            if not cascade:
+                continue
+            for lsnr in variable.listeners:
+                if getattr(lsnr, "NOTIFY_ONCE_PER_BATCH", False):
+                    once[id(lsnr)] = (lsnr, variable)
+                else:
+                    each.append((lsnr, variable))
+        for lsnr, variable in each:
+            lsnr.variable_changed(variable)
+        for lsnr, variable in once.values():
+            lsnr.variable_changed(variable)
+        logger.log(SPAM_LEVEL, f"update many: {len(names)} updated, {changed} changed, {len(each) + len(once)} notifications")
+        return changed
 
     def dump(self, filename: str = "variable-database-dump.yaml"):
         drefs = {d.name: d.value for d in self.database.values()}  #  if d.is_internal